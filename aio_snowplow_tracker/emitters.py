@@ -19,15 +19,21 @@
     License: Apache License Version 2.0
 """
 import asyncio
+import json
 import logging
 import time
 import aiohttp
-from typing import Optional, Union, Tuple
+from json.encoder import encode_basestring as _encode_json_str
+from typing import Any, Dict, Optional, Union, Tuple
 
-from aio_snowplow_tracker.self_describing_json import SelfDescribingJson
 from aio_snowplow_tracker.typing import PayloadDict, PayloadDictList, HttpProtocol, Method, SuccessCallback, FailureCallback
 from aio_snowplow_tracker.contracts import one_of
-from aio_snowplow_tracker._timer import Timer
+
+_ORJSON_OPT = True
+try:
+    import orjson
+except ImportError:
+    _ORJSON_OPT = False
 
 # logging
 logging.basicConfig()
@@ -38,6 +44,112 @@ DEFAULT_MAX_LENGTH = 10
 PAYLOAD_DATA_SCHEMA = "iglu:com.snowplowanalytics.snowplow/payload_data/jsonschema/1-0-4"
 PROTOCOLS = {"http", "https"}
 METHODS = {"get", "post"}
+POST_CONTENT_TYPE = 'application/json; charset=utf-8'
+
+
+class _SharedConnector(object):
+    """
+        Connection pool and DNS cache shared by the owned sessions of all emitters on one event loop,
+        counting the sessions that still use it
+    """
+
+    __slots__ = ("loop", "connector", "users")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.connector = aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
+        self.users = 0
+
+    def release(self) -> Optional[aiohttp.TCPConnector]:
+        """
+            Drops one session from the count. Once no session uses the connector,
+            forgets it and returns it so the caller can close it.
+
+            :rtype: aiohttp.TCPConnector | None
+        """
+        self.users -= 1
+        if self.users > 0:
+            return None
+        if _shared_connectors.get(self.loop) is self:
+            del _shared_connectors[self.loop]
+        return self.connector
+
+
+# A connector keeps a strong reference to its loop, so entries are removed explicitly:
+# when their last session is closed, by `close_shared_connector`, or once their loop is found closed
+_shared_connectors: Dict[asyncio.AbstractEventLoop, _SharedConnector] = {}
+
+
+def _get_shared(loop: asyncio.AbstractEventLoop) -> _SharedConnector:
+    """
+        Returns the shared connector entry of the loop, creating it on first use
+
+        :rtype: _SharedConnector
+    """
+    for closed_loop in [other for other in _shared_connectors if other.is_closed()]:
+        del _shared_connectors[closed_loop]
+    shared = _shared_connectors.get(loop)
+    if shared is None or shared.connector.closed:
+        shared = _shared_connectors[loop] = _SharedConnector(loop)
+    return shared
+
+
+def get_shared_connector() -> aiohttp.TCPConnector:
+    """
+        Returns the connector shared by emitter-owned sessions on the running event loop,
+        creating it on first use
+
+        :rtype: aiohttp.TCPConnector
+    """
+    return _get_shared(asyncio.get_running_loop()).connector
+
+
+async def close_shared_connector() -> None:
+    """
+        Closes the connector shared by emitter-owned sessions on the running event loop, if any.
+        The connector is also closed when the last emitter using it is closed;
+        emitters used afterwards create a new one.
+    """
+    shared = _shared_connectors.pop(asyncio.get_running_loop(), None)
+    if shared is not None:
+        await shared.connector.close()
+
+
+def dumps_json(obj: Any) -> bytes:
+    """
+        Serializes an object to UTF-8 encoded JSON,
+        using orjson if it is installed and the standard library otherwise.
+        Strings with lone surrogates cannot be encoded as UTF-8,
+        so an object holding one is serialized with ASCII escapes instead.
+
+        :param obj:  The object to serialize
+        :rtype:      bytes
+    """
+    if _ORJSON_OPT:
+        try:
+            return orjson.dumps(obj)
+        except orjson.JSONEncodeError:
+            pass
+    try:
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    except UnicodeEncodeError:
+        return json.dumps(obj, separators=(',', ':')).encode('ascii')
+
+
+def _json_str_size(value: str) -> int:
+    """
+        Size in bytes of a string serialized as UTF-8 JSON.
+        Lone surrogates are counted as three bytes instead of failing.
+
+        :param value:  The string to measure
+        :rtype:        int
+    """
+    return len(_encode_json_str(value).encode('utf-8', 'surrogatepass'))
+
+
+# The payload_data envelope is constant, so only the events are serialized per flush
+_POST_BODY_PREFIX = b'{"schema":' + dumps_json(PAYLOAD_DATA_SCHEMA) + b',"data":'
+_POST_BODY_SUFFIX = b'}'
 
 
 class Emitter(object):
@@ -85,8 +197,9 @@ class Emitter(object):
                                      applies to both "connect" AND "read" timeout, or as tuple with two float values
                                      which specify the "connect" and "read" timeouts separately
             :type request_timeout:  float | tuple | None
-            :param client_session: Provide an aiohttp ClientSession to improve performance by reusing sessions.
-                                   By default, a new session will be created on every track call.
+            :param client_session: Provide an aiohttp ClientSession to share connections with the rest of the application.
+                                   By default, the emitter creates its own session on first use and reuses it
+                                   until `close` is called.
             :type client_session:  aiohttp.ClientSession | None
         """
         one_of(protocol, PROTOCOLS)
@@ -102,20 +215,27 @@ class Emitter(object):
             else:
                 buffer_size = 1
         self.buffer_size = buffer_size
+        # input_nowait refuses events beyond this many, until the scheduled flush catches up
+        self.max_queued = 10 * buffer_size
         self.buffer = []
         self.byte_limit = byte_limit
-        self.bytes_queued = None if byte_limit is None else 0
+        self.bytes_queued = 0
         self.request_timeout = request_timeout
+        self._timeout = Emitter.as_client_timeout(request_timeout)
         self.client_session = client_session
+        self._owned_session: Optional[aiohttp.ClientSession] = None
+        self._owned_connector: Optional[_SharedConnector] = None
 
         self.on_success = on_success
         self.on_failure = on_failure
 
         self.lock = asyncio.Lock()
+        # The single flush scheduled by input_nowait, kept referenced so it is not garbage collected
+        self._pending_flush: Optional[asyncio.Task] = None
 
-        self.timer = None
+        self.timer: Optional[asyncio.Task] = None
 
-        logger.info("Emitter initialized with endpoint " + self.endpoint)
+        logger.info("Emitter initialized with endpoint %s", self.endpoint)
 
     @staticmethod
     def as_collector_uri(
@@ -142,9 +262,23 @@ class Emitter(object):
         else:
             path = "/com.snowplowanalytics.snowplow/tp2"
         if port is None:
-            return protocol + "://" + endpoint + path
+            return f"{protocol}://{endpoint}{path}"
         else:
-            return protocol + "://" + endpoint + ":" + str(port) + path
+            return f"{protocol}://{endpoint}:{port}{path}"
+
+    @staticmethod
+    def as_client_timeout(request_timeout: Optional[Union[float, Tuple[float, float]]]) -> aiohttp.ClientTimeout:
+        """
+            :param request_timeout:  A single timeout in seconds, a (connect, read) tuple, or None for no timeout
+            :type  request_timeout:  float | tuple | None
+            :rtype:                  aiohttp.ClientTimeout
+        """
+        if request_timeout is None:
+            return aiohttp.ClientTimeout(total=None)
+        if isinstance(request_timeout, tuple):
+            connect_timeout, read_timeout = request_timeout
+            return aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        return aiohttp.ClientTimeout(total=float(request_timeout))
 
     async def input(self, payload: PayloadDict) -> None:
         """
@@ -154,17 +288,102 @@ class Emitter(object):
             :param payload:   The name-value pairs for the event
             :type  payload:   dict(string:*)
         """
-        async with self.lock:
-            if self.bytes_queued is not None:
-                self.bytes_queued += len(str(payload))
+        self._buffer_event(payload)
+        if self.reached_limit():
+            await self._flush_unsafe()
 
-            if self.method == "post":
-                self.buffer.append({key: str(payload[key]) for key in payload})
-            else:
-                self.buffer.append(payload)
+    def input_nowait(self, payload: PayloadDict) -> None:
+        """
+            Adds an event to the buffer without waiting.
+            If the maximum size has been reached, a flush is scheduled on the running event loop.
+            Only one scheduled flush is pending at a time, and the buffer holds at most `max_queued` events.
+
+            :param payload:   The name-value pairs for the event
+            :type  payload:   dict(string:*)
+            :raises asyncio.QueueFull: if `max_queued` events are already buffered
+        """
+        if len(self.buffer) >= self.max_queued:
+            raise asyncio.QueueFull(f"Emitter buffer holds {len(self.buffer)} events, the most input_nowait accepts")
+        self._buffer_event(payload)
+        if self._pending_flush is None and self.reached_limit():
+            self._pending_flush = asyncio.get_running_loop().create_task(self._flush_if_reached_limit())
+
+    def _buffer_event(self, payload: PayloadDict) -> None:
+        """
+            Appends an event to the buffer and updates the queued byte count.
 
-            if self.reached_limit():
+            :param payload:   The name-value pairs for the event
+            :type  payload:   dict(string:*)
+        """
+        if self.method == "post":
+            event, size = Emitter.stringify_and_size(payload)
+            self.buffer.append(event)
+        else:
+            size = Emitter.payload_size(payload) if self.byte_limit is not None else 0
+            self.buffer.append(payload)
+        self.bytes_queued += size
+
+    async def _flush_if_reached_limit(self) -> None:
+        """
+            Flushes the buffer for as long as a limit is reached,
+            as another task may have flushed since this one was scheduled
+            and more events may have been added while a request was in flight.
+        """
+        try:
+            while self.reached_limit():
                 await self._flush_unsafe()
+        finally:
+            self._pending_flush = None
+
+    @staticmethod
+    def stringify_and_size(payload: PayloadDict) -> Tuple[PayloadDict, int]:
+        """
+            Converts every value of the payload to a string, as required for POST requests,
+            and computes the UTF-8 byte size of the resulting compact JSON object in a single pass
+
+            :param payload:   The name-value pairs for the event
+            :type  payload:   dict(string:*)
+            :rtype:           tuple(dict(string:string), int)
+        """
+        event = {}
+        # "{" plus "}" in place of the last pair's ","
+        size = 1 if payload else 2
+        for key, value in payload.items():
+            value = str(value)
+            event[key] = value
+            # "key":"value",
+            size += _json_str_size(key) + _json_str_size(value) + 2
+        return event, size
+
+    @staticmethod
+    def payload_size(payload: PayloadDict) -> int:
+        """
+            Computes the UTF-8 byte size of the payload serialized as a compact JSON object,
+            with all values as strings
+
+            :param payload:   The name-value pairs for the event
+            :type  payload:   dict(string:*)
+            :rtype:           int
+        """
+        size = 1 if payload else 2
+        for key, value in payload.items():
+            size += _json_str_size(key) + _json_str_size(str(value)) + 2
+        return size
+
+    @property
+    def byte_limit(self) -> Optional[int]:
+        """
+            The size of the queued events after reaching which they are flushed
+
+            :rtype: int | None
+        """
+        return self._byte_limit
+
+    @byte_limit.setter
+    def byte_limit(self, byte_limit: Optional[int]) -> None:
+        self._byte_limit = byte_limit
+        # Pick the limit check whenever the byte limit changes, rather than on every input
+        self._reached_limit = self._reached_count_limit if byte_limit is None else self._reached_count_or_byte_limit
 
     def reached_limit(self) -> bool:
         """
@@ -172,53 +391,129 @@ class Emitter(object):
 
             :rtype: bool
         """
-        if self.byte_limit is None:
-            return len(self.buffer) >= self.buffer_size
-        else:
-            return (self.bytes_queued or 0) >= self.byte_limit or len(self.buffer) >= self.buffer_size
+        return self._reached_limit()
+
+    def _reached_count_limit(self) -> bool:
+        """
+            Checks if the event-count limit is reached.
+            Used by `reached_limit` when no byte limit is set.
+
+            :rtype: bool
+        """
+        return len(self.buffer) >= self.buffer_size
+
+    def _reached_count_or_byte_limit(self) -> bool:
+        """
+            Checks if event-count or bytes limit are reached.
+            Used by `reached_limit` when a byte limit is set.
+
+            :rtype: bool
+        """
+        return self.bytes_queued >= self._byte_limit or len(self.buffer) >= self.buffer_size
 
     async def flush(self) -> None:
         """
             Sends all events in the buffer to the collector.
+            Only the buffer handoff is done under `lock`, so a flush never waits
+            for the request of another flush that is still in flight.
         """
         async with self.lock:
-            await self._flush_unsafe()
+            evts = self._take_buffer()
+        await self.send_events(evts)
 
     async def _flush_unsafe(self) -> None:
         """
-            Sends all events in the buffer to the collector without locking.
+            Sends all events in the buffer to the collector without taking `lock`.
+            The buffer handoff never yields to the event loop, so concurrent flushes
+            each send a distinct batch and only wait for their own request.
         """
-        await self.send_events(self.buffer)
-        self.buffer = []
-        if self.bytes_queued is not None:
-            self.bytes_queued = 0
+        await self.send_events(self._take_buffer())
+
+    def _take_buffer(self) -> PayloadDictList:
+        """
+            Hands the full buffer off and starts a fresh one, so events added
+            while the request is in flight are kept for the next flush.
+
+            :rtype: list(dict(string:*))
+        """
+        evts, self.buffer = self.buffer, []
+        self.bytes_queued = 0
+        return evts
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+            Returns the user-provided session, or lazily creates a session owned by this emitter.
+            The owned session is bound to the event loop it was created on and is replaced
+            if the emitter is later used from another loop.
+            Owned sessions share one connector per event loop, see `get_shared_connector`.
+
+            :rtype: aiohttp.ClientSession
+        """
+        if self.client_session is not None:
+            return self.client_session
+
+        loop = asyncio.get_running_loop()
+        session, previous = self._owned_session, self._owned_connector
+        if session is None or session.closed or previous.loop is not loop:
+            # Claim the new connector before releasing the old one, so a connector shared on this loop stays open
+            shared = _get_shared(loop)
+            shared.users += 1
+            # Install the new session before any await, so concurrent callers reuse it
+            self._owned_session = aiohttp.ClientSession(connector=shared.connector, connector_owner=False)
+            self._owned_connector = shared
+            if previous is not None:
+                connector = previous.release()
+                # The session does not own its connector, so closing it does not touch its event loop
+                await session.close()
+                if connector is not None and previous.loop is loop:
+                    await connector.close()
+        return self._owned_session
+
+    def _release_owned_session(self) -> Optional[aiohttp.TCPConnector]:
+        """
+            Forgets the owned session and drops it from the count of its shared connector.
+            Returns that connector if no other session uses it, so the caller can close it.
+
+            :rtype: aiohttp.TCPConnector | None
+        """
+        connector = self._owned_connector.release() if self._owned_connector is not None else None
+        self._owned_session = None
+        self._owned_connector = None
+        return connector
 
-    async def http_post(self, data: str) -> bool:
+    async def close(self) -> None:
+        """
+            Closes the session created by this emitter, if any,
+            and the shared connector once no other emitter on the loop uses it.
+            A user-provided `client_session` is left open.
+        """
+        session = self._owned_session
+        connector = self._release_owned_session()
+        if session is not None:
+            await session.close()
+        if connector is not None:
+            await connector.close()
+
+    async def http_post(self, data: bytes) -> bool:
         """
             :param data:  The array of JSONs to be sent
-            :type  data:  string
+            :type  data:  bytes
         """
-        logger.info("Sending POST request to %s..." % self.endpoint)
-        logger.debug("Payload: %s" % data)
+        logger.info("Sending POST request to %s...", self.endpoint)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Payload: %s", data.decode("utf-8"))
         post_succeeded = False
-        session = self.client_session if self.client_session else aiohttp.ClientSession()
+        session = await self._get_session()
         try:
             async with session.post(
                     self.endpoint,
-                    data=data,
-                    headers={'Content-Type': 'application/json; charset=utf-8'},
-                    timeout=self.request_timeout,
+                    data=aiohttp.BytesPayload(data, content_type=POST_CONTENT_TYPE),
+                    timeout=self._timeout,
             ) as r:
-                post_succeeded = Emitter.is_good_status_code(r.status)
-                logger.log(
-                    level=logging.INFO if post_succeeded else logging.ERROR,
-                    msg=f"GET request finished with status code: {r.status}"
-                )
+                post_succeeded = 200 <= r.status < 400
+                (logger.info if post_succeeded else logger.error)("POST request finished with status code: %s", r.status)
         except aiohttp.ClientError as e:
             logger.error(e)
-        finally:
-            if session != self.client_session:
-                await session.close()
 
         return post_succeeded
 
@@ -227,29 +522,24 @@ class Emitter(object):
             :param payload:  The event properties
             :type  payload:  dict(string:*)
         """
-        logger.info(f"Sending GET request to {self.endpoint}...")
-        logger.debug(f"Payload: {payload}")
+        logger.info("Sending GET request to %s...", self.endpoint)
+        logger.debug("Payload: %s", payload)
         get_succeeded = False
-        session = self.client_session if self.client_session else aiohttp.ClientSession()
+        session = await self._get_session()
         try:
-            async with session.get(self.endpoint, params=payload, timeout=self.request_timeout) as r:
-                get_succeeded = Emitter.is_good_status_code(r.status)
-                logger.log(
-                    level=logging.INFO if get_succeeded else logging.ERROR,
-                    msg=f"GET request finished with status code: {r.status}"
-                )
+            async with session.get(self.endpoint, params=payload, timeout=self._timeout) as r:
+                get_succeeded = 200 <= r.status < 400
+                (logger.info if get_succeeded else logger.error)("GET request finished with status code: %s", r.status)
         except aiohttp.ClientError as e:
             logger.error(e)
-        finally:
-            if session != self.client_session:
-                await session.close()
 
         return get_succeeded
 
     async def sync_flush(self) -> None:
         """
-            Calls the flush method of the base Emitter class.
-            This is guaranteed to be flushed immediately, without buffering.
+            Calls the flush method of the base Emitter class, bypassing any buffering
+            a subclass adds to `flush`. The buffered events are sent right away;
+            the call does not wait for other flushes that are still in flight.
         """
         logger.debug("Starting synchronous flush...")
         await Emitter.flush(self)
@@ -270,27 +560,27 @@ class Emitter(object):
             :type  evts: list(dict(string:*))
         """
         if len(evts) > 0:
-            logger.info("Attempting to send %s events" % len(evts))
+            logger.info("Attempting to send %s events", len(evts))
 
-            Emitter.attach_sent_timestamp(evts)
+            # All events in a flush are sent at the same instant
+            stm = str(int(time.time() * 1000))
+            Emitter.attach_sent_timestamp(evts, stm)
             success_events = []
             failure_events = []
 
             if self.method == 'post':
-                data = SelfDescribingJson(PAYLOAD_DATA_SCHEMA, evts).to_string()
+                data = b"".join((_POST_BODY_PREFIX, dumps_json(evts), _POST_BODY_SUFFIX))
                 request_succeeded = await self.http_post(data)
+                # The buffer was handed off by the flush, so the list can be passed on without copying
                 if request_succeeded:
-                    success_events += evts
+                    success_events = evts
                 else:
-                    failure_events += evts
+                    failure_events = evts
 
             elif self.method == 'get':
-                for evt in evts:
-                    request_succeeded = await self.http_get(evt)
-                    if request_succeeded:
-                        success_events += [evt]
-                    else:
-                        failure_events += [evt]
+                results = await asyncio.gather(*(self.http_get(evt) for evt in evts))
+                for evt, request_succeeded in zip(evts, results):
+                    (success_events if request_succeeded else failure_events).append(evt)
 
             if self.on_success is not None and len(success_events) > 0:
                 self.on_success(success_events)
@@ -310,10 +600,21 @@ class Emitter(object):
             :type  flush_now: bool
         """
 
+        self.cancel_flush_timer()
         if flush_now:
             await self.flush()
-        # Repeatable create new timer
-        self.timer = Timer(timeout, self.set_flush_timer, [timeout, True])
+        self.timer = asyncio.get_running_loop().create_task(self._flush_periodically(timeout))
+
+    async def _flush_periodically(self, timeout: float) -> None:
+        """
+            Flushes the buffer every `timeout` seconds until cancelled
+
+            :param timeout:   interval in seconds
+            :type  timeout:   int | float
+        """
+        while True:
+            await asyncio.sleep(timeout)
+            await self.flush()
 
     def cancel_flush_timer(self) -> None:
         """
@@ -322,19 +623,21 @@ class Emitter(object):
 
         if self.timer is not None:
             self.timer.cancel()
+            self.timer = None
 
     @staticmethod
-    def attach_sent_timestamp(events: PayloadDictList) -> None:
+    def attach_sent_timestamp(events: PayloadDictList, stm: Optional[str] = None) -> None:
         """
             Attach (by mutating in-place) current timestamp in milliseconds
             as `stm` param
 
             :param events: Array of events to be sent
             :type  events: list(dict(string:*))
+            :param stm:    Sent timestamp in milliseconds, defaults to the current time
+            :type  stm:    string | None
             :rtype: None
         """
-        def update(e: PayloadDict) -> None:
-            e.update({'stm': str(int(time.time()) * 1000)})
-
+        if stm is None:
+            stm = str(int(time.time() * 1000))
         for event in events:
-            update(event)
+            event['stm'] = stm
@@ -0,0 +1,29 @@
+"""
+    conftest.py
+
+    Copyright (c) 2013-2021 Snowplow Analytics Ltd. All rights reserved.
+
+    This program is licensed to you under the Apache License Version 2.0,
+    and you may not use this file except in compliance with the Apache License
+    Version 2.0. You may obtain a copy of the Apache License Version 2.0 at
+    http://www.apache.org/licenses/LICENSE-2.0.
+
+    Unless required by applicable law or agreed to in writing,
+    software distributed under the Apache License Version 2.0 is distributed on
+    an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+    express or implied. See the Apache License Version 2.0 for the specific
+    language governing permissions and limitations there under.
+
+    Authors: Anuj More, Alex Dean, Fred Blundun, Paul Boocock
+    Copyright: Copyright (c) 2013-2021 Snowplow Analytics Ltd
+    License: Apache License Version 2.0
+"""
+
+from typing import Any
+
+
+def pytest_configure(config: Any) -> None:
+    config.addinivalue_line(
+        "markers",
+        "parallel_safe: the tests share no mutable state and can be distributed across pytest-xdist workers",
+    )
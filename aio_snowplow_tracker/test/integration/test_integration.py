@@ -70,11 +70,21 @@ async def failing_snowplow_server(aiohttp_server) -> TestServer:
     return await aiohttp_server(app)
 
 
-def create_emitter(snowplow_server: TestServer, **kwargs):
-    return emitters.Emitter(snowplow_server.host, protocol='http', port=snowplow_server.port, **kwargs)
+@pytest.fixture
+async def create_emitter():
+    created = []
+
+    def create(snowplow_server: TestServer, **kwargs):
+        e = emitters.Emitter(snowplow_server.host, protocol='http', port=snowplow_server.port, **kwargs)
+        created.append(e)
+        return e
+
+    yield create
+    for e in created:
+        await e.close()
 
 
-async def test_integration_page_view(snowplow_server: TestServer, default_subject: subject.Subject):
+async def test_integration_page_view(create_emitter, snowplow_server: TestServer, default_subject: subject.Subject):
     t = tracker.Tracker([create_emitter(snowplow_server)], default_subject)
     await t.track_page_view("http://savethearctic.org", "Save The Arctic", "http://referrer.com")
 
@@ -82,7 +92,7 @@ async def test_integration_page_view(snowplow_server: TestServer, default_subjec
     assert expected.items() <= snowplow_server.app['requests'][-1].query.items()
 
 
-async def test_integration_ecommerce_transaction_item(snowplow_server: TestServer, default_subject):
+async def test_integration_ecommerce_transaction_item(create_emitter, snowplow_server: TestServer, default_subject):
     t = tracker.Tracker([create_emitter(snowplow_server)], default_subject)
     await t.track_ecommerce_transaction_item("12345", "pbz0025", 7.99, 2, "black-tarot", "tarot", currency="GBP")
     expected_fields = {"ti_ca": "tarot", "ti_id": "12345", "ti_qu": "2", "ti_sk": "pbz0025", "e": "ti",
@@ -90,7 +100,7 @@ async def test_integration_ecommerce_transaction_item(snowplow_server: TestServe
     assert expected_fields.items() <= snowplow_server.app['requests'][-1].query.items()
 
 
-async def test_integration_ecommerce_transaction(snowplow_server: TestServer, default_subject: subject.Subject):
+async def test_integration_ecommerce_transaction(create_emitter, snowplow_server: TestServer, default_subject: subject.Subject):
     t = tracker.Tracker([create_emitter(snowplow_server)], default_subject)
     await t.track_ecommerce_transaction(
         "6a8078be", 35, city="London", currency="GBP",
@@ -115,7 +125,7 @@ async def test_integration_ecommerce_transaction(snowplow_server: TestServer, de
     assert queries_dicts[-3]['ttm'] == queries_dicts[-2]['ttm']
 
 
-async def test_integration_screen_view(snowplow_server: TestServer, default_subject: subject.Subject):
+async def test_integration_screen_view(create_emitter, snowplow_server: TestServer, default_subject: subject.Subject):
     t = tracker.Tracker([create_emitter(snowplow_server)], default_subject, encode_base64=False)
     await t.track_screen_view("Game HUD 2", id_="534")
 
@@ -133,7 +143,7 @@ async def test_integration_screen_view(snowplow_server: TestServer, default_subj
     }
 
 
-async def test_integration_gather_unstruct_event(snowplow_server: TestServer, default_subject: subject.Subject):
+async def test_integration_gather_unstruct_event(create_emitter, snowplow_server: TestServer, default_subject: subject.Subject):
     t = tracker.Tracker([create_emitter(snowplow_server)], default_subject, encode_base64=False)
     n_products = 10
     product_ids = {f"PRODUCT_{i}" for i in range(n_products)}
@@ -152,7 +162,7 @@ async def test_integration_gather_unstruct_event(snowplow_server: TestServer, de
     assert product_ids == received_product_ids
 
 
-async def test_integration_struct_event(snowplow_server: TestServer, default_subject: subject.Subject):
+async def test_integration_struct_event(create_emitter, snowplow_server: TestServer, default_subject: subject.Subject):
     t = tracker.Tracker([create_emitter(snowplow_server)], default_subject)
     await t.track_struct_event("Ecomm", "add-to-basket", "dog-skateboarding-video", "hd", 13.99)
 
@@ -162,7 +172,7 @@ async def test_integration_struct_event(snowplow_server: TestServer, default_sub
     assert query_dict.items() >= expect.items()
 
 
-async def test_integration_unstruct_event_non_base64(snowplow_server: TestServer, default_subject: subject.Subject):
+async def test_integration_unstruct_event_non_base64(create_emitter, snowplow_server: TestServer, default_subject: subject.Subject):
     t = tracker.Tracker([create_emitter(snowplow_server)], default_subject, encode_base64=False)
     product_data = {"product_id": "ASO01043", "price$flt": 49.95, "walrus$tms": 1000}
     await t.track_unstruct_event(SelfDescribingJson("iglu:com.acme/viewed_product/jsonschema/2-0-2", product_data))
@@ -175,7 +185,7 @@ async def test_integration_unstruct_event_non_base64(snowplow_server: TestServer
     }
 
 
-async def test_integration_unstruct_event_base64(snowplow_server: TestServer, default_subject: subject.Subject):
+async def test_integration_unstruct_event_base64(create_emitter, snowplow_server: TestServer, default_subject: subject.Subject):
     t = tracker.Tracker([create_emitter(snowplow_server)], default_subject, encode_base64=True)
     product_data = {"product_id": "ASO01043", "price$flt": 49.95, "walrus$tms": 1000}
     await t.track_unstruct_event(SelfDescribingJson("iglu:com.acme/viewed_product/jsonschema/2-0-2", product_data))
@@ -189,7 +199,7 @@ async def test_integration_unstruct_event_base64(snowplow_server: TestServer, de
     }
 
 
-async def test_integration_context_non_base64(snowplow_server: TestServer, default_subject: subject.Subject):
+async def test_integration_context_non_base64(create_emitter, snowplow_server: TestServer, default_subject: subject.Subject):
     t = tracker.Tracker([create_emitter(snowplow_server)], default_subject, encode_base64=False)
     await t.track_page_view("localhost", "local host", None, [
         SelfDescribingJson("iglu:com.example/user/jsonschema/2-0-3", {"user_type": "tester"})])
@@ -202,7 +212,7 @@ async def test_integration_context_non_base64(snowplow_server: TestServer, defau
     }
 
 
-async def test_integration_context_base64(snowplow_server: TestServer, default_subject: subject.Subject):
+async def test_integration_context_base64(create_emitter, snowplow_server: TestServer, default_subject: subject.Subject):
     t = tracker.Tracker([create_emitter(snowplow_server)], default_subject, encode_base64=True)
     await t.track_page_view("localhost", "local host", None, [
         SelfDescribingJson("iglu:com.example/user/jsonschema/2-0-3", {"user_type": "tester"})])
@@ -215,7 +225,7 @@ async def test_integration_context_base64(snowplow_server: TestServer, default_s
     }
 
 
-async def test_integration_standard_nv_pairs(snowplow_server: TestServer):
+async def test_integration_standard_nv_pairs(create_emitter, snowplow_server: TestServer):
     s = subject.Subject()
     s.set_platform("mob")
     s.set_user_id("user12345")
@@ -236,7 +246,7 @@ async def test_integration_standard_nv_pairs(snowplow_server: TestServer):
     assert query_dict["dtm"] is not None
 
 
-async def test_integration_identification_methods(snowplow_server: TestServer):
+async def test_integration_identification_methods(create_emitter, snowplow_server: TestServer):
     s = subject.Subject()
     s.set_domain_user_id("4616bfb38f872d16")
     s.set_ip_address("255.255.255.255")
@@ -254,7 +264,7 @@ async def test_integration_identification_methods(snowplow_server: TestServer):
     }.items()
 
 
-async def test_integration_event_subject(snowplow_server: TestServer):
+async def test_integration_event_subject(create_emitter, snowplow_server: TestServer):
     s = subject.Subject()
     s.set_domain_user_id("4616bfb38f872d16")
     s.set_ip_address("255.255.255.255")
@@ -290,7 +300,7 @@ async def test_integration_redis_custom(emitter_kwargs: Dict, expected_key: str,
             redis_emitter.RedisEmitter()
 
 
-async def test_integration_success_callback(snowplow_server: TestServer, default_subject: subject.Subject):
+async def test_integration_success_callback(create_emitter, snowplow_server: TestServer, default_subject: subject.Subject):
     callback_success_queue = []
     callback_failure_queue = []
     callback_emitter = create_emitter(
@@ -310,7 +320,7 @@ async def test_integration_success_callback(snowplow_server: TestServer, default
     assert callback_failure_queue == []
 
 
-async def test_integration_failure_callback(failing_snowplow_server, default_subject: subject.Subject):
+async def test_integration_failure_callback(create_emitter, failing_snowplow_server, default_subject: subject.Subject):
     callback_success_queue = []
     callback_failure_queue = []
     callback_emitter = create_emitter(
@@ -323,7 +333,7 @@ async def test_integration_failure_callback(failing_snowplow_server, default_sub
     assert callback_failure_queue[0] == 0
 
 
-async def test_post_page_view(snowplow_server: TestServer, default_subject: subject.Subject):
+async def test_post_page_view(create_emitter, snowplow_server: TestServer, default_subject: subject.Subject):
     t = tracker.Tracker([create_emitter(snowplow_server, method='post', buffer_size=1)], default_subject)
     await t.track_page_view("localhost", "local host", None)
 
@@ -334,7 +344,7 @@ async def test_post_page_view(snowplow_server: TestServer, default_subject: subj
     assert data['data'][0].items() >= {"e": "pv", "page": "local host", "url": "localhost"}.items()
 
 
-async def test_post_batched(snowplow_server: TestServer, default_subject: subject.Subject):
+async def test_post_batched(create_emitter, snowplow_server: TestServer, default_subject: subject.Subject):
     t = tracker.Tracker(create_emitter(snowplow_server, method='post', buffer_size=2), default_subject)
     await t.track_struct_event("Test", "A")
     await t.track_struct_event("Test", "B")
@@ -345,7 +355,7 @@ async def test_post_batched(snowplow_server: TestServer, default_subject: subjec
 
 
 @freeze_time("2021-04-19 00:00:01")  # unix: 1618790401000
-async def test_timestamps(snowplow_server: TestServer, default_subject: subject.Subject):
+async def test_timestamps(create_emitter, snowplow_server: TestServer, default_subject: subject.Subject):
     t = tracker.Tracker([create_emitter(snowplow_server, method='post', buffer_size=3)], default_subject)
     await t.track_page_view("localhost", "stamp0", None, tstamp=None)
     await t.track_page_view("localhost", "stamp1", None, tstamp=1358933694000)
@@ -363,20 +373,20 @@ async def test_timestamps(snowplow_server: TestServer, default_subject: subject.
             assert data["data"][i].get(attr) == expected_timestamps[i][attr]
 
 
-async def test_bytelimit(snowplow_server: TestServer, default_subject: subject.Subject):
-    post_emitter = create_emitter(snowplow_server, method='post', buffer_size=5, byte_limit=420)
+async def test_bytelimit(create_emitter, snowplow_server: TestServer, default_subject: subject.Subject):
+    post_emitter = create_emitter(snowplow_server, method='post', buffer_size=5, byte_limit=387)
     t = tracker.Tracker([post_emitter], default_subject)
-    await t.track_struct_event("Test", "A")  # 140 bytes
-    await t.track_struct_event("Test", "A")  # 280 bytes
-    await t.track_struct_event("Test", "A")  # 420 bytes. Send
-    await t.track_struct_event("Test", "AA")  # 141
+    await t.track_struct_event("Test", "A")  # 129 bytes
+    await t.track_struct_event("Test", "A")  # 258 bytes
+    await t.track_struct_event("Test", "A")  # 387 bytes. Send
+    await t.track_struct_event("Test", "AA")  # 130
 
     data = await snowplow_server.app['requests'][-1].json()
     assert len(data["data"]) == 3
-    assert post_emitter.bytes_queued == 136 + len(_version.__version__)
+    assert post_emitter.bytes_queued == len(emitters.dumps_json(post_emitter.buffer[0])) == 125 + len(_version.__version__)
 
 
-async def test_unicode_get(snowplow_server: TestServer, default_subject: subject.Subject):
+async def test_unicode_get(create_emitter, snowplow_server: TestServer, default_subject: subject.Subject):
     t = tracker.Tracker([create_emitter(snowplow_server)], default_subject, encode_base64=False)
     unicode_a = u'\u0107'
     unicode_b = u'test.\u0107om'
@@ -392,7 +402,7 @@ async def test_unicode_get(snowplow_server: TestServer, default_subject: subject
     assert unicode_b == json.loads(screen_view_query["ue_pr"])['data']['data']['name']
 
 
-async def test_unicode_post(snowplow_server: TestServer, default_subject: subject.Subject):
+async def test_unicode_post(create_emitter, snowplow_server: TestServer, default_subject: subject.Subject):
     post_emitter = create_emitter(snowplow_server, method='post', buffer_size=1)
     t = tracker.Tracker([post_emitter], default_subject, encode_base64=False)
     unicode_a = u'\u0107'
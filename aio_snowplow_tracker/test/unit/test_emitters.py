@@ -19,25 +19,22 @@
     License: Apache License Version 2.0
 """
 import asyncio
+import gc
+import json
 import time
 import unittest
 import unittest.mock as mock
+import weakref
 from freezegun import freeze_time
 from typing import Any
+import aiohttp
 from aiohttp import ServerTimeoutError
 
-from aio_snowplow_tracker.emitters import Emitter, DEFAULT_MAX_LENGTH
+from aio_snowplow_tracker.emitters import Emitter, DEFAULT_MAX_LENGTH, PAYLOAD_DATA_SCHEMA, dumps_json, get_shared_connector, close_shared_connector
+from aio_snowplow_tracker.emitters import _shared_connectors
 
 
 # helpers
-async def mocked_flush(*args: Any) -> None:
-    pass
-
-
-async def mocked_send_events(*args: Any) -> None:
-    pass
-
-
 async def mocked_http_success(*args: Any) -> bool:
     return True
 
@@ -70,7 +67,7 @@ class TestEmitters(AsyncTestCase):
         self.assertEqual(e.buffer_size, 1)
         self.assertEqual(e.buffer, [])
         self.assertIsNone(e.byte_limit)
-        self.assertIsNone(e.bytes_queued)
+        self.assertEqual(e.bytes_queued, 0)
         self.assertIsNone(e.on_success)
         self.assertIsNone(e.on_failure)
         self.assertIsNone(e.timer)
@@ -91,6 +88,12 @@ class TestEmitters(AsyncTestCase):
     def test_init_requests_timeout(self) -> None:
         e = Emitter('0.0.0.0', request_timeout=(2.5, 5))
         self.assertEqual(e.request_timeout, (2.5, 5))
+        self.assertEqual(e._timeout, aiohttp.ClientTimeout(sock_connect=2.5, sock_read=5))
+
+    def test_as_client_timeout(self) -> None:
+        self.assertEqual(Emitter.as_client_timeout(None), aiohttp.ClientTimeout(total=None))
+        self.assertEqual(Emitter.as_client_timeout(3), aiohttp.ClientTimeout(total=3.0))
+        self.assertEqual(Emitter.as_client_timeout((1, 2.5)), aiohttp.ClientTimeout(sock_connect=1, sock_read=2.5))
 
     def test_as_collector_uri(self) -> None:
         uri = Emitter.as_collector_uri('0.0.0.0')
@@ -114,8 +117,6 @@ class TestEmitters(AsyncTestCase):
 
     @async_patch('aio_snowplow_tracker.Emitter.flush')
     async def test_input_no_flush(self, mok_flush: Any) -> None:
-        mok_flush.side_effect = mocked_flush
-
         e = Emitter('0.0.0.0', method="get", buffer_size=2)
         nvPairs = {"n0": "v0", "n1": "v1"}
         await e.input(nvPairs)
@@ -127,9 +128,34 @@ class TestEmitters(AsyncTestCase):
         mok_flush.assert_not_called()
 
     @async_patch('aio_snowplow_tracker.Emitter._flush_unsafe')
-    async def test_input_flush_byte_limit(self, mok_flush: Any) -> None:
-        mok_flush.side_effect = mocked_flush
+    async def test_reached_limit_follows_byte_limit(self, mok_flush: Any) -> None:
+        e = Emitter('0.0.0.0', method="get", buffer_size=10)
+        await e.input({"n0": "v0"})
+        self.assertFalse(e.reached_limit())
+
+        e.byte_limit = 16
+        await e.input({"n0": "v0", "n1": "v1"})
+        self.assertTrue(e.reached_limit())
+        self.assertEqual(mok_flush.call_count, 1)
 
+        e.byte_limit = None
+        await e.input({"n0": "v0"})
+        self.assertFalse(e.reached_limit())
+        self.assertEqual(mok_flush.call_count, 1)
+
+    @async_patch('aio_snowplow_tracker.Emitter._flush_unsafe')
+    async def test_reached_limit_override(self, mok_flush: Any) -> None:
+        class AlwaysFlushEmitter(Emitter):
+            def reached_limit(self) -> bool:
+                return True
+
+        self.assertTrue(hasattr(Emitter, "reached_limit"))
+        e = AlwaysFlushEmitter('0.0.0.0', buffer_size=10)
+        await e.input({"n0": "v0"})
+        self.assertEqual(mok_flush.call_count, 1)
+
+    @async_patch('aio_snowplow_tracker.Emitter._flush_unsafe')
+    async def test_input_flush_byte_limit(self, mok_flush: Any) -> None:
         e = Emitter('0.0.0.0', method="get", buffer_size=2, byte_limit=16)
         nvPairs = {"n0": "v0", "n1": "v1"}
         await e.input(nvPairs)
@@ -141,8 +167,6 @@ class TestEmitters(AsyncTestCase):
 
     @async_patch('aio_snowplow_tracker.Emitter._flush_unsafe')
     async def test_input_flush_buffer(self, mok_flush: Any) -> None:
-        mok_flush.side_effect = mocked_flush
-
         e = Emitter('0.0.0.0', method="get", buffer_size=2, byte_limit=1024)
         nvPairs = {"n0": "v0", "n1": "v1"}
         await e.input(nvPairs)
@@ -160,32 +184,108 @@ class TestEmitters(AsyncTestCase):
 
     @async_patch('aio_snowplow_tracker.Emitter._flush_unsafe')
     async def test_input_bytes_queued(self, mok_flush: Any) -> None:
-        mok_flush.side_effect = mocked_flush
-
         e = Emitter('0.0.0.0', method="get", buffer_size=2, byte_limit=1024)
         nvPairs = {"n0": "v0", "n1": "v1"}
         await e.input(nvPairs)
 
         self.assertEqual(len(e.buffer), 1)
-        self.assertEqual(e.bytes_queued, 24)
+        self.assertEqual(e.bytes_queued, 21)  # {"n0":"v0","n1":"v1"}
 
         await e.input(nvPairs)
-        self.assertEqual(e.bytes_queued, 48)
+        self.assertEqual(e.bytes_queued, 42)
 
     @async_patch('aio_snowplow_tracker.Emitter._flush_unsafe')
     async def test_input_bytes_post(self, mok_flush: Any) -> None:
-        mok_flush.side_effect = mocked_flush
-
         e = Emitter('0.0.0.0', method="post")
         nvPairs = {"testString": "test", "testNum": 2.72}
         await e.input(nvPairs)
 
         self.assertEqual(e.buffer, [{"testString": "test", "testNum": "2.72"}])
 
+    @async_patch('aio_snowplow_tracker.Emitter._flush_unsafe')
+    async def test_input_bytes_queued_post(self, mok_flush: Any) -> None:
+        e = Emitter('0.0.0.0', method="post", byte_limit=1024)
+        nvPairs = {"testString": "test", "testNum": 2.72}
+        await e.input(nvPairs)
+
+        self.assertEqual(e.bytes_queued, len(json.dumps(e.buffer[0], separators=(',', ':'))))
+
+    def test_payload_size_matches_json_bytes(self) -> None:
+        payloads = [
+            {},
+            {"testString": "test", "testNum": 2.72},
+            {"url": "test.ćom", "name": "\U0001F600 \"quoted\" \\ back\nslash\x01"},
+        ]
+        for payload in payloads:
+            event, size = Emitter.stringify_and_size(payload)
+            self.assertEqual(size, len(dumps_json(event)))
+            self.assertEqual(Emitter.payload_size(payload), len(dumps_json(event)))
+
+    def test_payload_size_lone_surrogate(self) -> None:
+        # a lone surrogate cannot be encoded as UTF-8 and is counted as three bytes
+        payload = {"url": "bad\udcff"}
+        self.assertEqual(Emitter.stringify_and_size(payload), (payload, 16))
+        self.assertEqual(Emitter.payload_size(payload), 16)
+
     @async_patch('aio_snowplow_tracker.Emitter.send_events')
-    async def test_flush(self, mok_send_events: Any) -> None:
-        mok_send_events.side_effect = mocked_send_events
+    async def test_input_nowait(self, mok_send_events: Any) -> None:
+        e = Emitter('0.0.0.0', buffer_size=2)
+        e.input_nowait({"n": "v"})
+        self.assertEqual(len(e.buffer), 1)
+        self.assertIsNone(e._pending_flush)
+
+        e.input_nowait({"n": "v"})
+        task = e._pending_flush
+        self.assertIsNotNone(task)
+        mok_send_events.assert_not_called()
 
+        await task
+        self.assertEqual(mok_send_events.call_count, 1)
+        self.assertEqual(len(e.buffer), 0)
+        self.assertIsNone(e._pending_flush)
+
+    @async_patch('aio_snowplow_tracker.Emitter.send_events')
+    async def test_input_nowait_burst(self, mok_send_events: Any) -> None:
+        e = Emitter('0.0.0.0', method="post", buffer_size=10, byte_limit=2000)
+        with self.assertRaises(asyncio.QueueFull):
+            for i in range(1000):
+                e.input_nowait({"n": str(i)})
+
+        self.assertEqual(i, e.max_queued)
+        self.assertEqual(len(e.buffer), 100)
+        # one flush is pending, not one per event past the limit
+        task = e._pending_flush
+        self.assertIsNotNone(task)
+        self.assertEqual(len([t for t in asyncio.all_tasks() if t is not asyncio.current_task()]), 1)
+
+        await task
+        self.assertEqual(mok_send_events.call_count, 1)
+        self.assertEqual(len(mok_send_events.call_args[0][0]), 100)
+        self.assertEqual(e.buffer, [])
+        self.assertEqual(e.bytes_queued, 0)
+        e.input_nowait({"n": "v"})
+        self.assertEqual(len(e.buffer), 1)
+
+    @async_patch('aio_snowplow_tracker.Emitter.send_events')
+    async def test_input_nowait_flushes_events_added_in_flight(self, mok_send_events: Any) -> None:
+        e = Emitter('0.0.0.0', buffer_size=2)
+
+        async def add_events(evts: Any) -> None:
+            if mok_send_events.call_count == 1:
+                e.input_nowait({"n": "v"})
+                e.input_nowait({"n": "v"})
+
+        mok_send_events.side_effect = add_events
+        e.input_nowait({"n": "v"})
+        e.input_nowait({"n": "v"})
+        await e._pending_flush
+
+        self.assertEqual(mok_send_events.call_count, 2)
+        self.assertEqual(e.buffer, [])
+        self.assertIsNone(e._pending_flush)
+
+    @async_patch('aio_snowplow_tracker.Emitter.send_events')
+    async def test_flush(self, mok_send_events: Any) -> None:
         e = Emitter('0.0.0.0', buffer_size=2, byte_limit=None)
         nvPairs = {"n": "v"}
         await e.input(nvPairs)
@@ -196,8 +296,6 @@ class TestEmitters(AsyncTestCase):
 
     @async_patch('aio_snowplow_tracker.Emitter.send_events')
     async def test_flush_bytes_queued(self, mok_send_events: Any) -> None:
-        mok_send_events.side_effect = mocked_send_events
-
         e = Emitter('0.0.0.0', buffer_size=2, byte_limit=256)
         nvPairs = {"n": "v"}
         await e.input(nvPairs)
@@ -207,6 +305,67 @@ class TestEmitters(AsyncTestCase):
         self.assertEqual(len(e.buffer), 0)
         self.assertEqual(e.bytes_queued, 0)
 
+    @async_patch('aio_snowplow_tracker.Emitter.send_events')
+    async def test_input_during_flush(self, mok_send_events: Any) -> None:
+        sent = []
+
+        async def mocked_slow_send_events(evts: Any) -> None:
+            sent.extend(evts)
+            await asyncio.sleep(0.01)
+
+        mok_send_events.side_effect = mocked_slow_send_events
+
+        e = Emitter('0.0.0.0', buffer_size=2)
+        await asyncio.gather(*(e.input({"n": str(i)}) for i in range(5)))
+        await e.flush()
+
+        self.assertEqual(sorted(ev["n"] for ev in sent), ["0", "1", "2", "3", "4"])
+        self.assertEqual(len(e.buffer), 0)
+
+    @async_patch('aio_snowplow_tracker.Emitter.send_events')
+    async def test_flush_does_not_wait_for_in_flight_flush(self, mok_send_events: Any) -> None:
+        release = asyncio.Event()
+        sent = []
+
+        async def mocked_blocking_send_events(evts: Any) -> None:
+            sent.append(evts)
+            await release.wait()
+
+        mok_send_events.side_effect = mocked_blocking_send_events
+
+        e = Emitter('0.0.0.0', buffer_size=10)
+        await e.input({"n": "0"})
+        first = asyncio.ensure_future(e.flush())
+        await asyncio.sleep(0)
+        await e.input({"n": "1"})
+        second = asyncio.ensure_future(e.flush())
+        await asyncio.sleep(0)
+
+        # the second batch is sent while the first request is still in flight
+        self.assertEqual(sent, [[{"n": "0"}], [{"n": "1"}]])
+        release.set()
+        await asyncio.gather(first, second)
+
+    @async_patch('aio_snowplow_tracker.Emitter.send_events')
+    async def test_flush_swaps_buffer_under_lock(self, mok_send_events: Any) -> None:
+        e = Emitter('0.0.0.0', buffer_size=10)
+        lock_held = []
+        mok_send_events.side_effect = lambda evts: lock_held.append(e.lock.locked())
+
+        await e.input({"n": "0"})
+        async with e.lock:
+            flushing = asyncio.ensure_future(e.flush())
+            await asyncio.sleep(0)
+            # the handoff waits for the lock
+            mok_send_events.assert_not_called()
+            self.assertEqual(len(e.buffer), 1)
+        await flushing
+
+        mok_send_events.assert_called_once_with([{"n": "0"}])
+        self.assertEqual(e.buffer, [])
+        # but the events are sent after it is released
+        self.assertEqual(lock_held, [False])
+
     @freeze_time("2021-04-14 00:00:02")  # unix: 1618358402000
     def test_attach_sent_tstamp(self) -> None:
         e = Emitter('0.0.0.0')
@@ -218,10 +377,21 @@ class TestEmitters(AsyncTestCase):
             reduced = reduced and "stm" in ev.keys() and ev["stm"] == "1618358402000"
         self.assertTrue(reduced)
 
+    @freeze_time("2021-04-14 00:00:02.345")  # unix: 1618358402345
+    def test_attach_sent_tstamp_millis(self) -> None:
+        ev_list = [{"a": "aa"}]
+
+        Emitter.attach_sent_timestamp(ev_list)
+        self.assertEqual(ev_list[0]["stm"], "1618358402345")
+
+    def test_attach_sent_tstamp_given(self) -> None:
+        ev_list = [{"a": "aa"}, {"b": "bb"}]
+
+        Emitter.attach_sent_timestamp(ev_list, "1618358402345")
+        self.assertEqual([ev["stm"] for ev in ev_list], ["1618358402345", "1618358402345"])
+
     @async_patch('aio_snowplow_tracker.Emitter.flush')
     async def test_flush_timer(self, mok_flush: Any) -> None:
-        mok_flush.side_effect = mocked_flush
-
         e = Emitter('0.0.0.0', method="post", buffer_size=10)
         ev_list = [{"a": "aa"}, {"b": "bb"}, {"c": "cc"}]
         for i in ev_list:
@@ -233,9 +403,22 @@ class TestEmitters(AsyncTestCase):
         self.assertEqual(mok_flush.call_count, 1)
 
     @async_patch('aio_snowplow_tracker.Emitter.flush')
-    async def test_cancel_flush_timer(self, mok_flush: Any) -> None:
-        mok_flush.side_effect = mocked_flush
+    async def test_flush_timer_repeats(self, mok_flush: Any) -> None:
+        e = Emitter('0.0.0.0', method="post", buffer_size=10)
+        await e.set_flush_timer(0.01, flush_now=True)
+        timer = e.timer
+        await asyncio.sleep(0.1)
+        self.assertGreaterEqual(mok_flush.call_count, 3)
+
+        # resetting the interval replaces the running task
+        await e.set_flush_timer(1)
+        await asyncio.sleep(0)
+        self.assertTrue(timer.cancelled())
+        e.cancel_flush_timer()
+        self.assertIsNone(e.timer)
 
+    @async_patch('aio_snowplow_tracker.Emitter.flush')
+    async def test_cancel_flush_timer(self, mok_flush: Any) -> None:
         e = Emitter('0.0.0.0', method="post", buffer_size=10)
         ev_list = [{"a": "aa"}, {"b": "bb"}, {"c": "cc"}]
         for i in ev_list:
@@ -274,6 +457,59 @@ class TestEmitters(AsyncTestCase):
         mok_success.assert_not_called()
         mok_failure.assert_called_once_with(0, evBuffer)
 
+    @async_patch('aio_snowplow_tracker.Emitter.http_get')
+    async def test_send_events_get_partial_failure(self, mok_http_get: Any) -> None:
+        async def mocked_http_partial(evt: Any) -> bool:
+            return "a" in evt
+
+        mok_http_get.side_effect = mocked_http_partial
+        mok_success = mock.Mock(return_value="success mocked")
+        mok_failure = mock.Mock(return_value="failure mocked")
+
+        e = Emitter('0.0.0.0', method="get", buffer_size=10, on_success=mok_success, on_failure=mok_failure)
+
+        evBuffer = [{"a": "aa"}, {"b": "bb"}, {"a": "cc"}]
+        await e.send_events(evBuffer)
+        mok_success.assert_called_once_with([evBuffer[0], evBuffer[2]])
+        mok_failure.assert_called_once_with(2, [evBuffer[1]])
+
+    def test_dumps_json(self) -> None:
+        obj = {"schema": PAYLOAD_DATA_SCHEMA, "data": [{"a": "\u0107"}]}
+        self.assertEqual(json.loads(dumps_json(obj)), obj)
+
+        with mock.patch('aio_snowplow_tracker.emitters._ORJSON_OPT', False):
+            self.assertEqual(dumps_json(obj), json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+
+    def test_dumps_json_lone_surrogate(self) -> None:
+        obj = {"data": [{"url": "bad\udcff", "a": "ć"}]}
+        expected = json.dumps(obj, separators=(',', ':')).encode('ascii')
+        self.assertEqual(dumps_json(obj), expected)
+
+        with mock.patch('aio_snowplow_tracker.emitters._ORJSON_OPT', False):
+            self.assertEqual(dumps_json(obj), expected)
+
+    @async_patch('aio_snowplow_tracker.Emitter.http_post')
+    async def test_input_post_lone_surrogate(self, mok_http_post: Any) -> None:
+        mok_http_post.side_effect = mocked_http_success
+        e = Emitter('0.0.0.0', method="post", buffer_size=1, byte_limit=1024)
+        await e.input({"url": "bad\udcff"})
+
+        body = mok_http_post.call_args[0][0]
+        self.assertEqual(json.loads(body)["data"][0]["url"], "bad\udcff")
+        self.assertEqual(Emitter.payload_size({"url": "bad\udcff"}), Emitter.stringify_and_size({"url": "bad\udcff"})[1])
+
+    @async_patch('aio_snowplow_tracker.Emitter.http_post')
+    async def test_send_events_post_body(self, mok_http_post: Any) -> None:
+        mok_http_post.side_effect = mocked_http_success
+
+        e = Emitter('0.0.0.0', method="post", buffer_size=10)
+        evBuffer = [{"a": "aa"}, {"b": "bb"}]
+        await e.send_events(evBuffer)
+
+        body = mok_http_post.call_args[0][0]
+        self.assertIsInstance(body, bytes)
+        self.assertEqual(json.loads(body), {"schema": PAYLOAD_DATA_SCHEMA, "data": evBuffer})
+
     @async_patch('aio_snowplow_tracker.Emitter.http_post')
     async def test_send_events_post_success(self, mok_http_post: Any) -> None:
         mok_http_post.side_effect = mocked_http_success
@@ -307,14 +543,27 @@ class TestEmitters(AsyncTestCase):
         get_succeeded = await e.http_get({"a": "b"})
 
         self.assertTrue(get_succeeded)
+        await e.close()
 
     @async_patch('aio_snowplow_tracker.emitters.aiohttp.ClientSession.post')
     async def test_http_post_successful(self, mok_post_request: Any) -> None:
         mok_post_request.return_value.__aenter__.return_value = mock.Mock(status=200)
         e = Emitter('0.0.0.0')
-        get_succeeded = await e.http_post({"a": "b"})
+        get_succeeded = await e.http_post(b'{"a":"b"}')
 
         self.assertTrue(get_succeeded)
+        await e.close()
+
+    @async_patch('aio_snowplow_tracker.emitters.aiohttp.ClientSession.post')
+    async def test_http_post_bytes_payload(self, mok_post_request: Any) -> None:
+        mok_post_request.return_value.__aenter__.return_value = mock.Mock(status=200)
+        e = Emitter('0.0.0.0', method="post")
+        await e.http_post(b'{"a":"b"}')
+
+        payload = mok_post_request.call_args[1]["data"]
+        self.assertIsInstance(payload, aiohttp.BytesPayload)
+        self.assertEqual(payload.content_type, "application/json; charset=utf-8")
+        await e.close()
 
     @async_patch('aio_snowplow_tracker.emitters.aiohttp.ClientSession.get')
     async def test_http_get_400_error(self, mok_get_request: Any) -> None:
@@ -325,6 +574,7 @@ class TestEmitters(AsyncTestCase):
             get_succeeded = await e.http_get({"a": "b"})
 
         self.assertFalse(get_succeeded)
+        await e.close()
 
     @async_patch('aio_snowplow_tracker.emitters.aiohttp.ClientSession.post')
     async def test_http_post_successful(self, mok_post_request: Any) -> None:
@@ -332,9 +582,10 @@ class TestEmitters(AsyncTestCase):
         e = Emitter('0.0.0.0')
 
         with self.assertLogs('aio_snowplow_tracker.emitters', level='ERROR'):
-            get_succeeded = await e.http_post({"a": "b"})
+            get_succeeded = await e.http_post(b'{"a":"b"}')
 
         self.assertFalse(get_succeeded)
+        await e.close()
 
     @async_patch('aio_snowplow_tracker.emitters.aiohttp.ClientSession.post')
     async def test_http_post_connect_timeout_error(self, mok_post_request: Any) -> None:
@@ -342,9 +593,10 @@ class TestEmitters(AsyncTestCase):
         e = Emitter('0.0.0.0')
 
         with self.assertLogs('aio_snowplow_tracker.emitters', level='ERROR'):
-            post_succeeded = await e.http_post("dummy_string")
+            post_succeeded = await e.http_post(b"dummy_string")
 
         self.assertFalse(post_succeeded)
+        await e.close()
 
     @async_patch('aio_snowplow_tracker.emitters.aiohttp.ClientSession.get')
     async def test_http_get_connect_timeout_error(self, mok_get_request: Any) -> None:
@@ -355,6 +607,7 @@ class TestEmitters(AsyncTestCase):
             get_succeeded = await e.http_get({"a": "b"})
 
         self.assertFalse(get_succeeded)
+        await e.close()
 
     @async_patch('aio_snowplow_tracker.Emitter.http_post')
     async def test_async_send_events_post_success(self, mok_http_post: Any) -> None:
@@ -381,3 +634,122 @@ class TestEmitters(AsyncTestCase):
         await ae.send_events(evBuffer)
         mok_success.assert_not_called()
         mok_failure.assert_called_with(0, evBuffer)
+
+    @async_patch('aio_snowplow_tracker.emitters.aiohttp.ClientSession.get')
+    async def test_http_get_reuses_owned_session(self, mok_get_request: Any) -> None:
+        mok_get_request.return_value.__aenter__.return_value = mock.Mock(status=200)
+        e = Emitter('0.0.0.0')
+        await e.http_get({"a": "b"})
+        session = e._owned_session
+        await e.http_get({"c": "d"})
+
+        self.assertIsNotNone(session)
+        self.assertIs(e._owned_session, session)
+        self.assertEqual(mok_get_request.call_count, 2)
+        await e.close()
+        self.assertTrue(session.closed)
+        self.assertIsNone(e._owned_session)
+
+    async def test_owned_sessions_share_connector(self) -> None:
+        e1 = Emitter('0.0.0.0')
+        e2 = Emitter('0.0.0.0', method="post")
+        s1 = await e1._get_session()
+        s2 = await e2._get_session()
+
+        self.assertIsNot(s1, s2)
+        self.assertIs(s1.connector, get_shared_connector())
+        self.assertIs(s2.connector, s1.connector)
+
+        connector = s1.connector
+        await e1.close()
+        self.assertFalse(connector.closed)
+        await e2.close()
+        self.assertTrue(connector.closed)
+        self.assertNotIn(asyncio.get_running_loop(), _shared_connectors)
+
+    async def test_close_shared_connector(self) -> None:
+        e = Emitter('0.0.0.0')
+        s1 = await e._get_session()
+        connector = s1.connector
+        await close_shared_connector()
+
+        self.assertTrue(connector.closed)
+        self.assertNotIn(asyncio.get_running_loop(), _shared_connectors)
+        s2 = await e._get_session()
+        self.assertIsNot(s2, s1)
+        connector = s2.connector
+        self.assertFalse(connector.closed)
+        await e.close()
+        self.assertTrue(connector.closed)
+
+    async def test_concurrent_sessions_after_close_shared_connector(self) -> None:
+        e = Emitter('0.0.0.0')
+        s1 = await e._get_session()
+        await close_shared_connector()
+
+        sessions = await asyncio.gather(*(e._get_session() for _ in range(3)))
+        self.assertTrue(s1.closed)
+        self.assertEqual(len({id(s) for s in sessions}), 1)
+        self.assertIs(e._owned_session, sessions[0])
+        self.assertEqual(_shared_connectors[asyncio.get_running_loop()].users, 1)
+
+        connector = sessions[0].connector
+        await e.close()
+        self.assertTrue(sessions[0].closed)
+        self.assertTrue(connector.closed)
+
+    @async_patch('aio_snowplow_tracker.emitters.aiohttp.ClientSession.get')
+    async def test_concurrent_gets_after_close_shared_connector(self, mok_get_request: Any) -> None:
+        mok_get_request.return_value.__aenter__.return_value = mock.Mock(status=200)
+        e = Emitter('0.0.0.0')
+        await e.http_get({"a": "b"})
+        await close_shared_connector()
+
+        results = await asyncio.gather(*(e.http_get({"n": str(i)}) for i in range(3)))
+        self.assertEqual(results, [True, True, True])
+        self.assertEqual(_shared_connectors[asyncio.get_running_loop()].users, 1)
+        connector = e._owned_session.connector
+        await e.close()
+        self.assertTrue(connector.closed)
+        self.assertNotIn(asyncio.get_running_loop(), _shared_connectors)
+
+    def test_shared_connector_released_with_loop(self) -> None:
+        async def use_and_close(e: Emitter) -> aiohttp.TCPConnector:
+            connector = (await e._get_session()).connector
+            await e.close()
+            return connector
+
+        async def use_only() -> None:
+            get_shared_connector()
+
+        loop = asyncio.new_event_loop()
+        connector = loop.run_until_complete(use_and_close(Emitter('0.0.0.0')))
+        self.assertTrue(connector.closed)
+        self.assertNotIn(loop, _shared_connectors)
+
+        # a connector left open is dropped once its loop is found closed
+        loop.run_until_complete(use_only())
+        self.assertIn(loop, _shared_connectors)
+        loop.close()
+        other_loop = asyncio.new_event_loop()
+        other_loop.run_until_complete(use_only())
+        self.assertNotIn(loop, _shared_connectors)
+        other_loop.run_until_complete(close_shared_connector())
+        other_loop.close()
+
+        loop_ref = weakref.ref(loop)
+        del loop, connector
+        gc.collect()
+        self.assertIsNone(loop_ref())
+
+    @async_patch('aio_snowplow_tracker.emitters.aiohttp.ClientSession.get')
+    async def test_http_get_client_session(self, mok_get_request: Any) -> None:
+        mok_get_request.return_value.__aenter__.return_value = mock.Mock(status=200)
+        session = aiohttp.ClientSession()
+        e = Emitter('0.0.0.0', client_session=session)
+        await e.http_get({"a": "b"})
+        await e.close()
+
+        self.assertIsNone(e._owned_session)
+        self.assertFalse(session.closed)
+        await session.close()
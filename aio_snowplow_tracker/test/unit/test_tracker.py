@@ -20,15 +20,19 @@
 """
 
 import re
+import sys
+import asyncio
 import json
+import time
 import unittest
 import unittest.mock as mock
 
+import pytest
 from freezegun import freeze_time
-from typing import Any, Type
+from typing import Any, Dict, List, Tuple, Type
 
 import aio_snowplow_tracker
-from aio_snowplow_tracker.contracts import disable_contracts, enable_contracts
+from aio_snowplow_tracker.contracts import contracts_enabled, disable_contracts, enable_contracts
 from aio_snowplow_tracker.tracker import Tracker
 from aio_snowplow_tracker.tracker import VERSION as TRACKER_VERSION
 from aio_snowplow_tracker.subject import Subject
@@ -47,116 +51,171 @@ SCREEN_VIEW_SCHEMA = "iglu:com.snowplowanalytics.snowplow/screen_view/jsonschema
 
 # helpers
 _TEST_UUID = '5628c4c6-3f8a-43f8-a09f-6ff68f68dfb6'
+_UUID_RE = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\Z')
 geoSchema = "iglu:com.snowplowanalytics.snowplow/geolocation_context/jsonschema/1-0-0"
 geoData = {"latitude": -23.2, "longitude": 43.0}
 movSchema = "iglu:com.acme_company/movie_poster/jsonschema/2-1-1"
 movData = {"movie": "TestMovie", "year": 2021}
 
+# immutable contexts shared by all tests, the tracker only reads from them
+GEO_CTX = SelfDescribingJson(geoSchema, geoData)
+MOV_CTX = SelfDescribingJson(movSchema, movData)
+TEST_CTX = SelfDescribingJson("test.context.schema", {"user": "tester"})
+
+# the context envelope complete_payload builds as "co" from [GEO_CTX, MOV_CTX]
+EXPECTED_CO = {
+    "schema": CONTEXT_SCHEMA,
+    "data": [
+        {"schema": geoSchema, "data": geoData},
+        {"schema": movSchema, "data": movData}
+    ]
+}
+
+# nv_pairs complete_payload passes to track under the frozen clock of TestCompletePayload
+_EXPECTED_BASE = {"eid": _TEST_UUID, "dtm": 1618790401000, "tv": TRACKER_VERSION, "p": "pc"}
+_EXPECTED_WITH_TTM = {**_EXPECTED_BASE, "ttm": 100010001000}
+_EXPECTED_WITH_SUBJECT = {**_EXPECTED_BASE, "lang": "EN", "uid": "tester"}
+
+# nv_pairs of the ecommerce transaction tests, never mutated
+_EXPECTED_TRANS = {
+    "e": "tr",
+    "tr_id": "1234",
+    "tr_tt": 10,
+    "tr_af": "transAffiliation",
+    "tr_tx": 2.5,
+    "tr_sh": 1.5,
+    "tr_ci": "transCity",
+    "tr_st": "transState",
+    "tr_co": "transCountry",
+    "tr_cu": "transCurrency"
+}
+_EXPECTED_TRANS_ITEM = {
+    "e": "ti",
+    "ti_id": "1234",
+    "ti_sk": "sku1234",
+    "ti_nm": "itemName",
+    "ti_ca": "itemCategory",
+    "ti_pr": 3.14,
+    "ti_qu": 1,
+    "ti_cu": "itemCurrency"
+}
+
 
 def mocked_uuid() -> str:
     return _TEST_UUID
 
 
-def mocked_track(pb: Any) -> None:
-    pass
-
-
-def mocked_complete_payload(*args: Any, **kwargs: Any) -> None:
-    pass
-
+def setUpModule() -> None:
+    # the tests exercise valid calls, so skip contract checks unless a test enables them
+    disable_contracts()
 
-def mocked_track_trans_item(*args: Any, **kwargs: Any) -> None:
-    pass
 
-
-def mocked_track_unstruct(*args: Any, **kwargs: Any) -> None:
-    pass
+def tearDownModule() -> None:
+    enable_contracts()
 
 
 class ContractsDisabled(object):
     def __enter__(self) -> None:
+        self._was_enabled = contracts_enabled()
         disable_contracts()
 
     def __exit__(self, type: Any, value: Any, traceback: Any) -> None:
+        if self._was_enabled:
+            enable_contracts()
+
+
+class ContractsEnabled(object):
+    def __enter__(self) -> None:
+        self._was_enabled = contracts_enabled()
         enable_contracts()
 
+    def __exit__(self, type: Any, value: Any, traceback: Any) -> None:
+        if not self._was_enabled:
+            disable_contracts()
+
+
+class _Recorder(object):
+    """
+        Awaitable stand-in for a tracker method that records its calls as (args, kwargs) pairs
+    """
+
+    def __init__(self) -> None:
+        self.call_args_list: List[Tuple[Tuple[Any, ...], Dict[str, Any]]] = []
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> None:
+        self.call_args_list.append((args, kwargs))
 
-try:
+
+class _StubEmitter(object):
+    """
+        Exposes only the emitter methods the tracker calls, each as an AsyncMock.
+        Much cheaper to build than a full AsyncMock standing in for the emitter itself.
+        Its slots seal it, so no attributes beyond these three can be added.
+    """
+
+    __slots__ = ("input", "flush", "sync_flush")
+
+    def __init__(self) -> None:
+        self.input = mock.AsyncMock()
+        self.flush = mock.AsyncMock()
+        self.sync_flush = mock.AsyncMock()
+
+    def reset_mock(self) -> None:
+        self.input.reset_mock()
+        self.flush.reset_mock()
+        self.sync_flush.reset_mock()
+
+
+if sys.version_info >= (3, 8):
     AsyncTestCase = unittest.IsolatedAsyncioTestCase
-    async_patch = mock.patch
     async_mock = mock.AsyncMock
-except AttributeError:
+
+    def async_patch_attr(owner: Any, name: str) -> Any:
+        # a bare AsyncMock, skipping both the target import and the signature introspection of the patched method
+        return mock.patch.object(owner, name, new_callable=mock.AsyncMock)
+
+    def create_mock_emitter() -> aio_snowplow_tracker.Emitter:
+        return _StubEmitter()
+
+else:
     # Python 3.7 compatibility
     import asynctest  # noqa
     AsyncTestCase = asynctest.TestCase
-    async_patch = asynctest.patch
+    async_patch_attr = asynctest.patch.object
     async_mock = asynctest.create_autospec
 
-
-def create_mock_emitter() -> aio_snowplow_tracker.Emitter:
-    try:
-        return mock.AsyncMock()
-    except AttributeError:
+    def create_mock_emitter() -> aio_snowplow_tracker.Emitter:
         return asynctest.create_autospec(aio_snowplow_tracker.Emitter)(endpoint=None)
 
 
-class TestTracker(AsyncTestCase):
+class TestTrackerReadOnly(AsyncTestCase):
+    """
+        Tests that only read from a tracker share one instance built once for the class.
+        Tests that swap its emitters restore them on cleanup.
+    """
 
-    def patch_emitter(self, name: str) -> Any:
-        # patcher = mock.patch(name)
-        # emitter = patcher.start()
-        # try:
-        #     emitter.side_effect = mock.AsyncMock
-        # except AttributeError:
-        #     emitter.side_effect = asynctest.create_autospec(aio_snowplow_tracker.Emitter)
-        # self.addCleanup(patcher.stop)
-        # return emitter
-        return asynctest.create_autospec(aio_snowplow_tracker.Emitter)
-
-    def setUp(self) -> None:
-        pass
-
-    async def test_initialisation(self) -> None:
-        e = create_mock_emitter()
-
-        t = Tracker([e], namespace="cloudfront", encode_base64=False, app_id="AF003")
-        self.assertEqual(t.standard_nv_pairs["tna"], "cloudfront")
-        self.assertEqual(t.standard_nv_pairs["aid"], "AF003")
-        self.assertEqual(t.encode_base64, False)
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._shared_emitter = create_mock_emitter()
+        cls._shared_tracker = Tracker(cls._shared_emitter)
 
     async def test_initialisation_default_optional(self) -> None:
-        e = create_mock_emitter()
-
-        t = Tracker(e)
-        self.assertEqual(t.emitters, [e])
+        t = self._shared_tracker
+        self.assertEqual(t.emitters, [self._shared_emitter])
         self.assertTrue(t.standard_nv_pairs["tna"] is None)
         self.assertTrue(t.standard_nv_pairs["aid"] is None)
         self.assertEqual(t.encode_base64, True)
 
-    async def test_initialisation_emitter_list(self) -> None:
-        e1 = create_mock_emitter()
-        e2 = create_mock_emitter()
-
-        t = Tracker([e1, e2])
-        self.assertEqual(t.emitters, [e1, e2])
-
     async def test_initialisation_error(self) -> None:
-        with self.assertRaises(ValueError):
+        with ContractsEnabled(), self.assertRaises(ValueError):
             Tracker([])
 
-    async def test_initialization_with_subject(self) -> None:
-        e = create_mock_emitter()
-
-        s = Subject()
-        t = Tracker(e, subject=s)
-        self.assertIs(t.subject, s)
-
     async def test_get_uuid(self) -> None:
         eid = Tracker.get_uuid()
-        self.assertIsNotNone(re.match(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\Z', eid))
+        self.assertIsNotNone(_UUID_RE.match(eid))
 
-    @freeze_time("1970-01-01 00:00:01")
-    async def test_get_timestamp(self) -> None:
+    @mock.patch.object(time, 'time', return_value=1.0)
+    def test_get_timestamp(self, mok_time: Any) -> None:
         tstamp = Tracker.get_timestamp()
         self.assertEqual(tstamp, 1000)   # 1970-01-01 00:00:01 in ms
 
@@ -168,27 +227,18 @@ class TestTracker(AsyncTestCase):
         tstamp = Tracker.get_timestamp(1399021242240.0303)
         self.assertEqual(tstamp, 1399021242240)
 
-    @freeze_time("1970-01-01 00:00:01")
-    async def test_get_timestamp_3(self) -> None:
+    @mock.patch.object(time, 'time', return_value=1.0)
+    def test_get_timestamp_3(self, mok_time: Any) -> None:
         tstamp = Tracker.get_timestamp("1399021242030")   # test wrong arg type
         self.assertEqual(tstamp, 1000)                    # 1970-01-01 00:00:01 in ms
 
-    @async_patch('aio_snowplow_tracker.Tracker.track')
-    async def test_alias_of_track_unstruct_event(self, mok_track: Any) -> None:
-        e = create_mock_emitter()
-
-        mok_track.side_effect = mocked_track
-        t = Tracker(e)
-        evJson = SelfDescribingJson("test.schema", {"n": "v"})
-        # call the alias
-        await t.track_self_describing_event(evJson)
-        self.assertEqual(mok_track.call_count, 1)
-
     async def test_flush(self) -> None:
         e1 = create_mock_emitter()
         e2 = create_mock_emitter()
 
-        t = Tracker([e1, e2])
+        t = self._shared_tracker
+        self.addCleanup(setattr, t, "emitters", t.emitters)
+        t.emitters = [e1, e2]
         await t.flush()
         e1.flush.assert_not_called()
         self.assertEqual(e1.sync_flush.call_count, 1)
@@ -199,264 +249,130 @@ class TestTracker(AsyncTestCase):
         e1 = create_mock_emitter()
         e2 = create_mock_emitter()
 
-        t = Tracker([e1, e2])
+        t = self._shared_tracker
+        self.addCleanup(setattr, t, "emitters", t.emitters)
+        t.emitters = [e1, e2]
         await t.flush(is_async=True)
         self.assertEqual(e1.flush.call_count, 1)
         e1.sync_flush.assert_not_called()
         self.assertEqual(e2.flush.call_count, 1)
         e2.sync_flush.assert_not_called()
 
-    async def test_set_subject(self) -> None:
-        e = create_mock_emitter()
-
-        t = Tracker(e)
-        new_subject = Subject()
-        self.assertIsNot(t.subject, new_subject)
-        t.set_subject(new_subject)
-        self.assertIs(t.subject, new_subject)
-
-    async def test_add_emitter(self) -> None:
-        e1 = create_mock_emitter()
-        e2 = create_mock_emitter()
-
-        t = Tracker(e1)
-        t.add_emitter(e2)
-        self.assertEqual(t.emitters, [e1, e2])
-
-    ###
-    # test track and complete payload methods
-    ###
-
-    async def test_track(self) -> None:
-        e1 = create_mock_emitter()
-        e2 = create_mock_emitter()
-        e3 = create_mock_emitter()
-
-        t = Tracker([e1, e2, e3])
-
-        p = Payload({"test": "track"})
-        await t.track(p)
-
-        e1.input.assert_called_once_with({"test": "track"})
-        e2.input.assert_called_once_with({"test": "track"})
-        e3.input.assert_called_once_with({"test": "track"})
-
-    @freeze_time("2021-04-19 00:00:01")  # unix: 1618790401000
-    @async_patch('aio_snowplow_tracker.Tracker.track')
-    @async_patch('aio_snowplow_tracker.Tracker.get_uuid')
-    async def test_complete_payload(self, mok_uuid: Any, mok_track: Any) -> None:
-        e = create_mock_emitter()
-
-        mok_uuid.side_effect = mocked_uuid
-        mok_track.side_effect = mocked_track
-
-        t = Tracker(e)
-        p = Payload()
-        await t.complete_payload(p, None, None, None)
-
-        self.assertEqual(mok_track.call_count, 1)
-        trackArgsTuple = mok_track.call_args_list[0][0]
-        self.assertEqual(len(trackArgsTuple), 1)
-        passed_nv_pairs = trackArgsTuple[0].nv_pairs
+    async def test_close(self) -> None:
+        closed = []
 
-        expected = {
-            "eid": _TEST_UUID,
-            "dtm": 1618790401000,
-            "tv": TRACKER_VERSION,
-            "p": "pc"
-        }
-        self.assertDictEqual(passed_nv_pairs, expected)
+        class ClosableEmitter(object):
+            async def input(self, payload: Any) -> None:
+                pass
 
-    @freeze_time("2021-04-19 00:00:01")  # unix: 1618790401000
-    @async_patch('aio_snowplow_tracker.Tracker.track')
-    @async_patch('aio_snowplow_tracker.Tracker.get_uuid')
-    async def test_complete_payload_tstamp_int(self, mok_uuid: Any, mok_track: Any) -> None:
-        e = create_mock_emitter()
+            async def close(self) -> None:
+                closed.append(self)
 
-        mok_uuid.side_effect = mocked_uuid
-        mok_track.side_effect = mocked_track
-
-        t = Tracker(e)
-        p = Payload()
-        time_in_millis = 100010001000
-        await t.complete_payload(p, None, time_in_millis, None)
-
-        self.assertEqual(mok_track.call_count, 1)
-        trackArgsTuple = mok_track.call_args_list[0][0]
-        self.assertEqual(len(trackArgsTuple), 1)
-        passed_nv_pairs = trackArgsTuple[0].nv_pairs
+        e1 = ClosableEmitter()
+        e2 = ClosableEmitter()
 
-        expected = {
-            "eid": _TEST_UUID,
-            "dtm": 1618790401000,
-            "ttm": time_in_millis,
-            "tv": TRACKER_VERSION,
-            "p": "pc"
-        }
-        self.assertDictEqual(passed_nv_pairs, expected)
+        t = self._shared_tracker
+        self.addCleanup(setattr, t, "emitters", t.emitters)
+        # an emitter without close is skipped
+        t.emitters = [e1, object(), e2]
+        await t.close()
+        self.assertEqual(closed, [e1, e2])
 
-    @freeze_time("2021-04-19 00:00:01")  # unix: 1618790401000
-    @async_patch('aio_snowplow_tracker.Tracker.track')
-    @async_patch('aio_snowplow_tracker.Tracker.get_uuid')
-    async def test_complete_payload_tstamp_dtm(self, mok_uuid: Any, mok_track: Any) -> None:
-        e = create_mock_emitter()
 
-        mok_uuid.side_effect = mocked_uuid
-        mok_track.side_effect = mocked_track
+class _TrackerFixture(AsyncTestCase):
+    """
+        Builds a fresh tracker around one stub emitter before each test.
+    """
 
-        t = Tracker(e)
-        p = Payload()
-        time_in_millis = 100010001000
-        await t.complete_payload(p, None, time_in_millis, None)
+    def setUp(self) -> None:
+        self.e = create_mock_emitter()
+        self.t = Tracker(self.e)
 
-        self.assertEqual(mok_track.call_count, 1)
-        trackArgsTuple = mok_track.call_args_list[0][0]
-        self.assertEqual(len(trackArgsTuple), 1)
-        passed_nv_pairs = trackArgsTuple[0].nv_pairs
 
-        expected = {
-            "eid": _TEST_UUID,
-            "dtm": 1618790401000,
-            "ttm": time_in_millis,
-            "tv": TRACKER_VERSION,
-            "p": "pc"
-        }
-        self.assertDictEqual(passed_nv_pairs, expected)
+class TestTracker(_TrackerFixture):
 
-    @freeze_time("2021-04-19 00:00:01")  # unix: 1618790401000
-    @async_patch('aio_snowplow_tracker.Tracker.track')
-    @async_patch('aio_snowplow_tracker.Tracker.get_uuid')
-    async def test_complete_payload_tstamp_ttm(self, mok_uuid: Any, mok_track: Any) -> None:
-        e = create_mock_emitter()
+    @classmethod
+    def setUpClass(cls) -> None:
+        # emitters for the multi-emitter tests, built once and reset before each test
+        cls._emitters = [create_mock_emitter() for _ in range(3)]
 
-        mok_uuid.side_effect = mocked_uuid
-        mok_track.side_effect = mocked_track
-
-        t = Tracker(e)
-        p = Payload()
-        time_in_millis = 100010001000
-        await t.complete_payload(p, None, time_in_millis, None)
+    def setUp(self) -> None:
+        super().setUp()
+        for e in self._emitters:
+            e.reset_mock()
 
-        self.assertEqual(mok_track.call_count, 1)
-        trackArgsTuple = mok_track.call_args_list[0][0]
-        self.assertEqual(len(trackArgsTuple), 1)
-        passed_nv_pairs = trackArgsTuple[0].nv_pairs
+    async def test_initialisation(self) -> None:
+        e = self.e
 
-        expected = {
-            "eid": _TEST_UUID,
-            "dtm": 1618790401000,
-            "ttm": time_in_millis,
-            "tv": TRACKER_VERSION,
-            "p": "pc"
-        }
-        self.assertDictEqual(passed_nv_pairs, expected)
+        t = Tracker([e], namespace="cloudfront", encode_base64=False, app_id="AF003")
+        self.assertEqual(t.standard_nv_pairs["tna"], "cloudfront")
+        self.assertEqual(t.standard_nv_pairs["aid"], "AF003")
+        self.assertEqual(t.encode_base64, False)
 
-    @freeze_time("2021-04-19 00:00:01")  # unix: 1618790401000
-    @async_patch('aio_snowplow_tracker.Tracker.track')
-    @async_patch('aio_snowplow_tracker.Tracker.get_uuid')
-    async def test_complete_payload_co(self, mok_uuid: Any, mok_track: Any) -> None:
-        e = create_mock_emitter()
+    async def test_initialisation_emitter_list(self) -> None:
+        e1, e2, _ = self._emitters
 
-        mok_uuid.side_effect = mocked_uuid
-        mok_track.side_effect = mocked_track
+        t = Tracker([e1, e2])
+        self.assertEqual(t.emitters, [e1, e2])
 
-        t = Tracker(e, encode_base64=False)
-        p = Payload()
+    async def test_initialization_with_subject(self) -> None:
+        e = self.e
 
-        geo_ctx = SelfDescribingJson(geoSchema, geoData)
-        mov_ctx = SelfDescribingJson(movSchema, movData)
-        ctx_array = [geo_ctx, mov_ctx]
-        await t.complete_payload(p, ctx_array, None, None)
+        s = Subject()
+        t = Tracker(e, subject=s)
+        self.assertIs(t.subject, s)
 
+    @async_patch_attr(Tracker, 'track')
+    async def test_alias_of_track_unstruct_event(self, mok_track: Any) -> None:
+        t = self.t
+        evJson = SelfDescribingJson("test.schema", {"n": "v"})
+        # call the alias
+        await t.track_self_describing_event(evJson)
         self.assertEqual(mok_track.call_count, 1)
-        trackArgsTuple = mok_track.call_args_list[0][0]
-        self.assertEqual(len(trackArgsTuple), 1)
-        passed_nv_pairs = trackArgsTuple[0].nv_pairs
-
-        expected_co = {
-            "schema": CONTEXT_SCHEMA,
-            "data": [
-                {
-                    "schema": geoSchema,
-                    "data": geoData
-                },
-                {
-                    "schema": movSchema,
-                    "data": movData
-                }
-            ]
-        }
-        self.assertIn("co", passed_nv_pairs)
-        self.assertDictEqual(json.loads(passed_nv_pairs["co"]), expected_co)
 
-    @freeze_time("2021-04-19 00:00:01")  # unix: 1618790401000
-    @async_patch('aio_snowplow_tracker.Tracker.track')
-    @async_patch('aio_snowplow_tracker.Tracker.get_uuid')
-    async def test_complete_payload_cx(self, mok_uuid: Any, mok_track: Any) -> None:
-        e = create_mock_emitter()
-
-        mok_uuid.side_effect = mocked_uuid
-        mok_track.side_effect = mocked_track
-
-        t = Tracker(e, encode_base64=True)
-        p = Payload()
-
-        geo_ctx = SelfDescribingJson(geoSchema, geoData)
-        mov_ctx = SelfDescribingJson(movSchema, movData)
-        ctx_array = [geo_ctx, mov_ctx]
-        await t.complete_payload(p, ctx_array, None, None)
+    async def test_set_subject(self) -> None:
+        t = self.t
+        new_subject = Subject()
+        self.assertIsNot(t.subject, new_subject)
+        t.set_subject(new_subject)
+        self.assertIs(t.subject, new_subject)
 
-        self.assertEqual(mok_track.call_count, 1)
-        trackArgsTuple = mok_track.call_args_list[0][0]
-        self.assertEqual(len(trackArgsTuple), 1)
-        passed_nv_pairs = trackArgsTuple[0].nv_pairs
+    async def test_add_emitter(self) -> None:
+        e1, e2, _ = self._emitters
 
-        self.assertIn("cx", passed_nv_pairs)
+        t = Tracker(e1)
+        t.add_emitter(e2)
+        self.assertEqual(t.emitters, [e1, e2])
 
-    @freeze_time("2021-04-19 00:00:01")  # unix: 1618790401000
-    @async_patch('aio_snowplow_tracker.Tracker.track')
-    @async_patch('aio_snowplow_tracker.Tracker.get_uuid')
-    async def test_complete_payload_event_subject(self, mok_uuid: Any, mok_track: Any) -> None:
-        e = create_mock_emitter()
+    ###
+    # test track method
+    ###
 
-        mok_uuid.side_effect = mocked_uuid
-        mok_track.side_effect = mocked_track
+    async def test_track(self) -> None:
+        e1, e2, e3 = self._emitters
 
-        t = Tracker(e)
-        p = Payload()
-        evSubject = Subject().set_lang('EN').set_user_id("tester")
-        await t.complete_payload(p, None, None, evSubject)
+        t = Tracker([e1, e2, e3])
 
-        self.assertEqual(mok_track.call_count, 1)
-        trackArgsTuple = mok_track.call_args_list[0][0]
-        self.assertEqual(len(trackArgsTuple), 1)
-        passed_nv_pairs = trackArgsTuple[0].nv_pairs
+        p = Payload({"test": "track"})
+        await t.track(p)
 
-        expected = {
-            "eid": _TEST_UUID,
-            "dtm": 1618790401000,
-            "tv": TRACKER_VERSION,
-            "p": "pc",
-            "lang": "EN",
-            "uid": "tester"
-        }
-        self.assertDictEqual(passed_nv_pairs, expected)
+        e1.input.assert_called_once_with({"test": "track"})
+        e2.input.assert_called_once_with({"test": "track"})
+        e3.input.assert_called_once_with({"test": "track"})
 
     ###
     # test track_x methods
     ###
 
-    @async_patch('aio_snowplow_tracker.Tracker.complete_payload')
+    @async_patch_attr(Tracker, 'complete_payload')
     async def test_track_unstruct_event(self, mok_complete_payload: Any) -> None:
-        e = create_mock_emitter()
-
-        mok_complete_payload.side_effect = mocked_complete_payload
+        e = self.e
 
         t = Tracker(e, encode_base64=False)
         evJson = SelfDescribingJson("test.sde.schema", {"n": "v"})
         await t.track_unstruct_event(evJson)
         self.assertEqual(mok_complete_payload.call_count, 1)
-        completeArgsList = mok_complete_payload.call_args_list[0][0]
+        completeArgsList = mok_complete_payload.call_args[0]
         self.assertEqual(len(completeArgsList), 4)
 
         # payload
@@ -476,25 +392,23 @@ class TestTracker(AsyncTestCase):
             "schema": UNSTRUCT_SCHEMA
         }
 
-        self.assertDictEqual(actualUePr, expectedUePr)
+        self.assertEqual(actualUePr, expectedUePr)
         self.assertEqual(actualPairs["e"], "ue")
         self.assertTrue(actualContextArg is None)
         self.assertTrue(actualTstampArg is None)
 
-    @async_patch('aio_snowplow_tracker.Tracker.complete_payload')
+    @async_patch_attr(Tracker, 'complete_payload')
     async def test_track_unstruct_event_all_args(self, mok_complete_payload: Any) -> None:
-        e = create_mock_emitter()
-
-        mok_complete_payload.side_effect = mocked_complete_payload
+        e = self.e
 
         t = Tracker(e, encode_base64=False)
         evJson = SelfDescribingJson("test.schema", {"n": "v"})
-        ctx = SelfDescribingJson("test.context.schema", {"user": "tester"})
+        ctx = TEST_CTX
         evContext = [ctx]
         evTstamp = 1399021242030
         await t.track_unstruct_event(evJson, evContext, evTstamp)
         self.assertEqual(mok_complete_payload.call_count, 1)
-        completeArgsList = mok_complete_payload.call_args_list[0][0]
+        completeArgsList = mok_complete_payload.call_args[0]
         self.assertEqual(len(completeArgsList), 4)
 
         # payload
@@ -514,40 +428,34 @@ class TestTracker(AsyncTestCase):
             "schema": UNSTRUCT_SCHEMA
         }
 
-        self.assertDictEqual(actualUePr, expectedUePr)
+        self.assertEqual(actualUePr, expectedUePr)
         self.assertEqual(actualPairs["e"], "ue")
         self.assertIs(actualContextArg[0], ctx)
         self.assertEqual(actualTstampArg, evTstamp)
 
-    @async_patch('aio_snowplow_tracker.Tracker.complete_payload')
+    @async_patch_attr(Tracker, 'complete_payload')
     async def test_track_unstruct_event_encode(self, mok_complete_payload: Any) -> None:
-        e = create_mock_emitter()
-
-        mok_complete_payload.side_effect = mocked_complete_payload
+        e = self.e
 
         t = Tracker(e, encode_base64=True)
         evJson = SelfDescribingJson("test.sde.schema", {"n": "v"})
         await t.track_unstruct_event(evJson)
         self.assertEqual(mok_complete_payload.call_count, 1)
-        completeArgsList = mok_complete_payload.call_args_list[0][0]
+        completeArgsList = mok_complete_payload.call_args[0]
         self.assertEqual(len(completeArgsList), 4)
 
         actualPayloadArg = completeArgsList[0]
         actualPairs = actualPayloadArg.nv_pairs
         self.assertTrue("ue_px" in actualPairs.keys())
 
-    @async_patch('aio_snowplow_tracker.Tracker.complete_payload')
+    @async_patch_attr(Tracker, 'complete_payload')
     async def test_track_struct_event(self, mok_complete_payload: Any) -> None:
-        e = create_mock_emitter()
-
-        mok_complete_payload.side_effect = mocked_complete_payload
-
-        t = Tracker(e)
-        ctx = SelfDescribingJson("test.context.schema", {"user": "tester"})
+        t = self.t
+        ctx = TEST_CTX
         evTstamp = 1399021242030
         await t.track_struct_event("Mixes", "Play", "Test", "TestProp", value=3.14, context=[ctx], tstamp=evTstamp)
         self.assertEqual(mok_complete_payload.call_count, 1)
-        completeArgsList = mok_complete_payload.call_args_list[0][0]
+        completeArgsList = mok_complete_payload.call_args[0]
         self.assertEqual(len(completeArgsList), 4)
 
         actualPayloadArg = completeArgsList[0]
@@ -563,22 +471,18 @@ class TestTracker(AsyncTestCase):
             "se_pr": "TestProp",
             "se_va": 3.14
         }
-        self.assertDictEqual(actualPairs, expectedPairs)
+        self.assertEqual(actualPairs, expectedPairs)
         self.assertIs(actualContextArg[0], ctx)
         self.assertEqual(actualTstampArg, evTstamp)
 
-    @async_patch('aio_snowplow_tracker.Tracker.complete_payload')
+    @async_patch_attr(Tracker, 'complete_payload')
     async def test_track_page_view(self, mok_complete_payload: Any) -> None:
-        e = create_mock_emitter()
-
-        mok_complete_payload.side_effect = mocked_complete_payload
-
-        t = Tracker(e)
-        ctx = SelfDescribingJson("test.context.schema", {"user": "tester"})
+        t = self.t
+        ctx = TEST_CTX
         evTstamp = 1399021242030
         await t.track_page_view("example.com", "Example", "docs.snowplowanalytics.com", context=[ctx], tstamp=evTstamp)
         self.assertEqual(mok_complete_payload.call_count, 1)
-        completeArgsList = mok_complete_payload.call_args_list[0][0]
+        completeArgsList = mok_complete_payload.call_args[0]
         self.assertEqual(len(completeArgsList), 4)
 
         actualPayloadArg = completeArgsList[0]
@@ -592,22 +496,18 @@ class TestTracker(AsyncTestCase):
             "page": "Example",
             "refr": "docs.snowplowanalytics.com"
         }
-        self.assertDictEqual(actualPairs, expectedPairs)
+        self.assertEqual(actualPairs, expectedPairs)
         self.assertIs(actualContextArg[0], ctx)
         self.assertEqual(actualTstampArg, evTstamp)
 
-    @async_patch('aio_snowplow_tracker.Tracker.complete_payload')
+    @async_patch_attr(Tracker, 'complete_payload')
     async def test_track_page_ping(self, mok_complete_payload: Any) -> None:
-        e = create_mock_emitter()
-
-        mok_complete_payload.side_effect = mocked_complete_payload
-
-        t = Tracker(e)
-        ctx = SelfDescribingJson("test.context.schema", {"user": "tester"})
+        t = self.t
+        ctx = TEST_CTX
         evTstamp = 1399021242030
         await t.track_page_ping("example.com", "Example", "docs.snowplowanalytics.com", 0, 1, 2, 3, context=[ctx], tstamp=evTstamp)
         self.assertEqual(mok_complete_payload.call_count, 1)
-        completeArgsList = mok_complete_payload.call_args_list[0][0]
+        completeArgsList = mok_complete_payload.call_args[0]
         self.assertEqual(len(completeArgsList), 4)
 
         actualPayloadArg = completeArgsList[0]
@@ -625,22 +525,18 @@ class TestTracker(AsyncTestCase):
             "pp_miy": 2,
             "pp_may": 3
         }
-        self.assertDictEqual(actualPairs, expectedPairs)
+        self.assertEqual(actualPairs, expectedPairs)
         self.assertIs(actualContextArg[0], ctx)
         self.assertEqual(actualTstampArg, evTstamp)
 
-    @async_patch('aio_snowplow_tracker.Tracker.complete_payload')
+    @async_patch_attr(Tracker, 'complete_payload')
     async def test_track_ecommerce_transaction_item(self, mok_complete_payload: Any) -> None:
-        e = create_mock_emitter()
-
-        mok_complete_payload.side_effect = mocked_complete_payload
-
-        t = Tracker(e)
-        ctx = SelfDescribingJson("test.context.schema", {"user": "tester"})
+        t = self.t
+        ctx = TEST_CTX
         evTstamp = 1399021242030
         await t.track_ecommerce_transaction_item("1234", "sku1234", 3.14, 1, "itemName", "itemCategory", "itemCurrency", context=[ctx], tstamp=evTstamp)
         self.assertEqual(mok_complete_payload.call_count, 1)
-        completeArgsList = mok_complete_payload.call_args_list[0][0]
+        completeArgsList = mok_complete_payload.call_args[0]
         self.assertEqual(len(completeArgsList), 4)
 
         actualPayloadArg = completeArgsList[0]
@@ -648,64 +544,33 @@ class TestTracker(AsyncTestCase):
         actualTstampArg = completeArgsList[2]
         actualPairs = actualPayloadArg.nv_pairs
 
-        expectedPairs = {
-            "e": "ti",
-            "ti_id": "1234",
-            "ti_sk": "sku1234",
-            "ti_nm": "itemName",
-            "ti_ca": "itemCategory",
-            "ti_pr": 3.14,
-            "ti_qu": 1,
-            "ti_cu": "itemCurrency"
-        }
-        self.assertDictEqual(actualPairs, expectedPairs)
+        self.assertEqual(actualPairs, _EXPECTED_TRANS_ITEM)
         self.assertIs(actualContextArg[0], ctx)
         self.assertEqual(actualTstampArg, evTstamp)
 
-    @async_patch('aio_snowplow_tracker.Tracker.complete_payload')
+    @async_patch_attr(Tracker, 'complete_payload')
     async def test_track_ecommerce_transaction_no_items(self, mok_complete_payload: Any) -> None:
-        e = create_mock_emitter()
-
-        mok_complete_payload.side_effect = mocked_complete_payload
-
-        t = Tracker(e)
-        ctx = SelfDescribingJson("test.context.schema", {"user": "tester"})
+        t = self.t
+        ctx = TEST_CTX
         evTstamp = 1399021242030
         await t.track_ecommerce_transaction("1234", 10, "transAffiliation", 2.5, 1.5, "transCity", "transState", "transCountry", "transCurrency", context=[ctx], tstamp=evTstamp)
         self.assertEqual(mok_complete_payload.call_count, 1)
-        completeArgsList = mok_complete_payload.call_args_list[0][0]
+        completeArgsList = mok_complete_payload.call_args[0]
         self.assertEqual(len(completeArgsList), 4)
         actualPayloadArg = completeArgsList[0]
         actualContextArg = completeArgsList[1]
         actualTstampArg = completeArgsList[2]
         actualPairs = actualPayloadArg.nv_pairs
 
-        expectedPairs = {
-            "e": "tr",
-            "tr_id": "1234",
-            "tr_tt": 10,
-            "tr_af": "transAffiliation",
-            "tr_tx": 2.5,
-            "tr_sh": 1.5,
-            "tr_ci": "transCity",
-            "tr_st": "transState",
-            "tr_co": "transCountry",
-            "tr_cu": "transCurrency"
-        }
-        self.assertDictEqual(actualPairs, expectedPairs)
+        self.assertEqual(actualPairs, _EXPECTED_TRANS)
         self.assertIs(actualContextArg[0], ctx)
         self.assertEqual(actualTstampArg, evTstamp)
 
-    @async_patch('aio_snowplow_tracker.Tracker.track_ecommerce_transaction_item')
-    @async_patch('aio_snowplow_tracker.Tracker.complete_payload')
+    @async_patch_attr(Tracker, 'track_ecommerce_transaction_item')
+    @async_patch_attr(Tracker, 'complete_payload')
     async def test_track_ecommerce_transaction_with_items(self, mok_complete_payload: Any, mok_track_trans_item: Any) -> None:
-        e = create_mock_emitter()
-
-        mok_complete_payload.side_effect = mocked_complete_payload
-        mok_track_trans_item.side_effect = mocked_track_trans_item
-
-        t = Tracker(e)
-        ctx = SelfDescribingJson("test.context.schema", {"user": "tester"})
+        t = self.t
+        ctx = TEST_CTX
         evTstamp = 1399021242030
         transItems = [
             {"sku": "sku1234", "quantity": 3, "price": 3.14},
@@ -722,478 +587,297 @@ class TestTracker(AsyncTestCase):
         actualTstampArg = firstCallArgsList[2]
         actualPairs = actualPayloadArg.nv_pairs
 
-        expectedTransPairs = {
-            "e": "tr",
-            "tr_id": "1234",
-            "tr_tt": 10,
-            "tr_af": "transAffiliation",
-            "tr_tx": 2.5,
-            "tr_sh": 1.5,
-            "tr_ci": "transCity",
-            "tr_st": "transState",
-            "tr_co": "transCountry",
-            "tr_cu": "transCurrency"
-        }
-        self.assertDictEqual(actualPairs, expectedTransPairs)
+        self.assertEqual(actualPairs, _EXPECTED_TRANS)
         self.assertIs(actualContextArg[0], ctx)
         self.assertEqual(actualTstampArg, evTstamp)
 
         # Items
-        calls_to_track_trans_item = mok_track_trans_item.call_count
-        self.assertEqual(calls_to_track_trans_item, 2)
-        callTrackItemsArgsList = mok_track_trans_item.call_args_list
-        # 1st item
-        firstItemCallArgs = callTrackItemsArgsList[0][0]
-        self.assertEqual((), firstItemCallArgs)
-        firstItemCallKwargs = callTrackItemsArgsList[0][1]
-
-        expectedFirstItemPairs = {
-            'tstamp': evTstamp,
-            'order_id': '1234',
-            'currency': 'transCurrency',
-            'sku': 'sku1234',
-            'quantity': 3,
-            "price": 3.14,
-            'event_subject': None
-        }
-        self.assertDictEqual(firstItemCallKwargs, expectedFirstItemPairs)
-        # 2nd item
-        secItemCallArgs = callTrackItemsArgsList[1][0]
-        self.assertEqual((), secItemCallArgs)
-        secItemCallKwargs = callTrackItemsArgsList[1][1]
-
-        expectedSecItemPairs = {
-            'tstamp': evTstamp,
-            'order_id': '1234',
-            'currency': 'transCurrency',
-            'sku': 'sku5678',
-            'quantity': 1,
-            "price": 2.72,
-            'event_subject': None
-        }
-        self.assertDictEqual(secItemCallKwargs, expectedSecItemPairs)
-
-    @async_patch('aio_snowplow_tracker.Tracker.track_unstruct_event')
-    async def test_track_link_click(self, mok_track_unstruct: Any) -> None:
-        e = create_mock_emitter()
-
-        mok_track_unstruct.side_effect = mocked_track_unstruct
-
-        t = Tracker(e)
-        ctx = SelfDescribingJson("test.context.schema", {"user": "tester"})
-        evTstamp = 1399021242030
-
-        await t.track_link_click("example.com", "elemId", ["elemClass1", "elemClass2"], "_blank", "elemContent", context=[ctx], tstamp=evTstamp)
-
-        expected = {
-            "schema": LINK_CLICK_SCHEMA,
-            "data": {
-                "targetUrl": "example.com",
-                "elementId": "elemId",
-                "elementClasses": ["elemClass1", "elemClass2"],
-                "elementTarget": "_blank",
-                "elementContent": "elemContent"
-            }
-        }
-
-        callArgs = mok_track_unstruct.call_args_list[0][0]
-        self.assertEqual(len(callArgs), 4)
-        self.assertDictEqual(callArgs[0].to_json(), expected)
-        self.assertIs(callArgs[1][0], ctx)
-        self.assertEqual(callArgs[2], evTstamp)
+        self.assertEqual(mok_track_trans_item.call_args_list, [
+            mock.call(tstamp=evTstamp, order_id="1234", currency="transCurrency", sku="sku1234", quantity=3, price=3.14, event_subject=None),
+            mock.call(tstamp=evTstamp, order_id="1234", currency="transCurrency", sku="sku5678", quantity=1, price=2.72, event_subject=None)
+        ])
+
+
+_FORM_SUBMIT_ELEMS = [
+    {
+        "name": "user_email",
+        "value": "fake@email.fake",
+        "nodeName": "INPUT",
+        "type": "email"
+    }
+]
+
+# an element whose type form_element rejects while contracts are enabled
+_INVALID_FORM_ELEMS = [
+    {
+        "name": "user_email",
+        "value": "fake@email.fake",
+        "nodeName": "INPUT",
+        "type": "invalid"
+    }
+]
+_EXPECTED_INVALID_FORM_SUBMIT = {"schema": FORM_SUBMIT_SCHEMA, "data": {
+    "formId": "testFormId",
+    "formClasses": ["testClass1", "testClass2"],
+    "elements": _INVALID_FORM_ELEMS
+}}
+
+# (track method, positional args, expected event json) for calls with every argument given
+_ALL_ARGS_CASES = [
+    ("track_link_click", ("example.com", "elemId", ["elemClass1", "elemClass2"], "_blank", "elemContent"), {"schema": LINK_CLICK_SCHEMA, "data": {
+        "targetUrl": "example.com",
+        "elementId": "elemId",
+        "elementClasses": ["elemClass1", "elemClass2"],
+        "elementTarget": "_blank",
+        "elementContent": "elemContent"
+    }}),
+    ("track_add_to_cart", ("sku1234", 3, "testName", "testCategory", 3.14, "testCurrency"), {"schema": ADD_TO_CART_SCHEMA, "data": {
+        "sku": "sku1234",
+        "quantity": 3,
+        "name": "testName",
+        "category": "testCategory",
+        "unitPrice": 3.14,
+        "currency": "testCurrency"
+    }}),
+    ("track_remove_from_cart", ("sku1234", 3, "testName", "testCategory", 3.14, "testCurrency"), {"schema": REMOVE_FROM_CART_SCHEMA, "data": {
+        "sku": "sku1234",
+        "quantity": 3,
+        "name": "testName",
+        "category": "testCategory",
+        "unitPrice": 3.14,
+        "currency": "testCurrency"
+    }}),
+    ("track_form_change", ("testFormId", "testElemId", "INPUT", "testValue", "text", ["testClass1", "testClass2"]), {"schema": FORM_CHANGE_SCHEMA, "data": {
+        "formId": "testFormId",
+        "elementId": "testElemId",
+        "nodeName": "INPUT",
+        "value": "testValue",
+        "type": "text",
+        "elementClasses": ["testClass1", "testClass2"]
+    }}),
+    ("track_form_submit", ("testFormId", ["testClass1", "testClass2"], _FORM_SUBMIT_ELEMS), {"schema": FORM_SUBMIT_SCHEMA, "data": {
+        "formId": "testFormId",
+        "formClasses": ["testClass1", "testClass2"],
+        "elements": _FORM_SUBMIT_ELEMS
+    }}),
+    ("track_site_search", (["track", "search"], {"new": True}, 100, 10), {"schema": SITE_SEARCH_SCHEMA, "data": {
+        "terms": ["track", "search"],
+        "filters": {"new": True},
+        "totalResults": 100,
+        "pageResults": 10
+    }}),
+    ("track_screen_view", ("screenName", "screenId"), {"schema": SCREEN_VIEW_SCHEMA, "data": {
+        "name": "screenName",
+        "id": "screenId"
+    }}),
+]
+
+# (case name, track method, args, kwargs, expected event json) for calls with only the required arguments
+_OPTIONAL_NONE_CASES = [
+    ("link_click", "track_link_click", ("example.com",), {}, {"schema": LINK_CLICK_SCHEMA, "data": {"targetUrl": "example.com"}}),
+    ("add_to_cart", "track_add_to_cart", ("sku1234", 1), {}, {"schema": ADD_TO_CART_SCHEMA, "data": {"sku": "sku1234", "quantity": 1}}),
+    ("remove_from_cart", "track_remove_from_cart", ("sku1234", 1), {}, {"schema": REMOVE_FROM_CART_SCHEMA, "data": {"sku": "sku1234", "quantity": 1}}),
+    ("form_change", "track_form_change", ("testFormId", "testElemId", "INPUT", "testValue"), {}, {"schema": FORM_CHANGE_SCHEMA, "data": {
+        "formId": "testFormId",
+        "elementId": "testElemId",
+        "nodeName": "INPUT",
+        "value": "testValue"
+    }}),
+    ("form_submit", "track_form_submit", ("testFormId",), {}, {"schema": FORM_SUBMIT_SCHEMA, "data": {"formId": "testFormId"}}),
+    ("form_submit_empty_elems", "track_form_submit", ("testFormId",), {"elements": []}, {"schema": FORM_SUBMIT_SCHEMA, "data": {"formId": "testFormId"}}),
+    ("site_search", "track_site_search", (["track", "search"],), {}, {"schema": SITE_SEARCH_SCHEMA, "data": {"terms": ["track", "search"]}}),
+]
+
+
+@pytest.mark.parallel_safe
+class TestTrackUnstructWrappers(unittest.TestCase):
+    """
+        The track_x methods that wrap track_unstruct_event.
+        Each test gets its own tracker whose track_unstruct_event is replaced by a plain recorder,
+        so no mock has to be built or patched in, and nothing mutable is shared between tests,
+        which keeps them safe to distribute across pytest-xdist workers (marked `parallel_safe`).
+        The tests drive the coroutines on one event loop built for the class,
+        instead of a loop per test like AsyncTestCase.
+    """
+
+    # shared by every call, the tracker only passes them on
+    CTX = TEST_CTX
+    EV_TS = 1399021242030
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._loop = asyncio.new_event_loop()
+        # installed as the current loop so code that looks it up finds the one running the tests
+        asyncio.set_event_loop(cls._loop)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        asyncio.set_event_loop(None)
+        cls._loop.close()
 
-    @async_patch('aio_snowplow_tracker.Tracker.track_unstruct_event')
-    async def test_track_link_click_optional_none(self, mok_track_unstruct: Any) -> None:
-        e = create_mock_emitter()
-
-        mok_track_unstruct.side_effect = mocked_track_unstruct
-
-        t = Tracker(e)
-
-        await t.track_link_click("example.com")
-
-        expected = {
-            "schema": LINK_CLICK_SCHEMA,
-            "data": {
-                "targetUrl": "example.com",
-            }
-        }
-
-        callArgs = mok_track_unstruct.call_args_list[0][0]
-        self.assertEqual(len(callArgs), 4)
-        self.assertDictEqual(callArgs[0].to_json(), expected)
-        self.assertTrue(callArgs[1] is None)
-        self.assertTrue(callArgs[2] is None)
-
-    @async_patch('aio_snowplow_tracker.Tracker.track_unstruct_event')
-    async def test_track_add_to_cart(self, mok_track_unstruct: Any) -> None:
-        e = create_mock_emitter()
-
-        mok_track_unstruct.side_effect = mocked_track_unstruct
-
-        t = Tracker(e)
-        ctx = SelfDescribingJson("test.context.schema", {"user": "tester"})
-        evTstamp = 1399021242030
-
-        await t.track_add_to_cart("sku1234", 3, "testName", "testCategory", 3.14, "testCurrency", context=[ctx], tstamp=evTstamp)
-
-        expected = {
-            "schema": ADD_TO_CART_SCHEMA,
-            "data": {
-                "sku": "sku1234",
-                "quantity": 3,
-                "name": "testName",
-                "category": "testCategory",
-                "unitPrice": 3.14,
-                "currency": "testCurrency"
-            }
-        }
-
-        callArgs = mok_track_unstruct.call_args_list[0][0]
-        self.assertEqual(len(callArgs), 4)
-        self.assertDictEqual(callArgs[0].to_json(), expected)
-        self.assertIs(callArgs[1][0], ctx)
-        self.assertEqual(callArgs[2], evTstamp)
-
-    @async_patch('aio_snowplow_tracker.Tracker.track_unstruct_event')
-    async def test_track_add_to_cart_optional_none(self, mok_track_unstruct: Any) -> None:
-        e = create_mock_emitter()
-
-        mok_track_unstruct.side_effect = mocked_track_unstruct
-
-        t = Tracker(e)
-
-        await t.track_add_to_cart("sku1234", 1)
-
-        expected = {
-            "schema": ADD_TO_CART_SCHEMA,
-            "data": {
-                "sku": "sku1234",
-                "quantity": 1
-            }
-        }
-
-        callArgs = mok_track_unstruct.call_args_list[0][0]
-        self.assertEqual(len(callArgs), 4)
-        self.assertDictEqual(callArgs[0].to_json(), expected)
-        self.assertTrue(callArgs[1] is None)
-        self.assertTrue(callArgs[2] is None)
-
-    @async_patch('aio_snowplow_tracker.Tracker.track_unstruct_event')
-    async def test_track_remove_from_cart(self, mok_track_unstruct: Any) -> None:
-        e = create_mock_emitter()
-
-        mok_track_unstruct.side_effect = mocked_track_unstruct
-
-        t = Tracker(e)
-        ctx = SelfDescribingJson("test.context.schema", {"user": "tester"})
-        evTstamp = 1399021242030
-
-        await t.track_remove_from_cart("sku1234", 3, "testName", "testCategory", 3.14, "testCurrency", context=[ctx], tstamp=evTstamp)
-
-        expected = {
-            "schema": REMOVE_FROM_CART_SCHEMA,
-            "data": {
-                "sku": "sku1234",
-                "quantity": 3,
-                "name": "testName",
-                "category": "testCategory",
-                "unitPrice": 3.14,
-                "currency": "testCurrency"
-            }
-        }
-
-        callArgs = mok_track_unstruct.call_args_list[0][0]
-        self.assertEqual(len(callArgs), 4)
-        self.assertDictEqual(callArgs[0].to_json(), expected)
-        self.assertIs(callArgs[1][0], ctx)
-        self.assertEqual(callArgs[2], evTstamp)
-
-    @async_patch('aio_snowplow_tracker.Tracker.track_unstruct_event')
-    async def test_track_remove_from_cart_optional_none(self, mok_track_unstruct: Any) -> None:
-        e = create_mock_emitter()
-
-        mok_track_unstruct.side_effect = mocked_track_unstruct
-
-        t = Tracker(e)
-
-        await t.track_remove_from_cart("sku1234", 1)
-
-        expected = {
-            "schema": REMOVE_FROM_CART_SCHEMA,
-            "data": {
-                "sku": "sku1234",
-                "quantity": 1
-            }
-        }
-
-        callArgs = mok_track_unstruct.call_args_list[0][0]
-        self.assertEqual(len(callArgs), 4)
-        self.assertDictEqual(callArgs[0].to_json(), expected)
-        self.assertTrue(callArgs[1] is None)
-        self.assertTrue(callArgs[2] is None)
-
-    @async_patch('aio_snowplow_tracker.Tracker.track_unstruct_event')
-    async def test_track_form_change(self, mok_track_unstruct: Any) -> None:
-        e = create_mock_emitter()
-
-        mok_track_unstruct.side_effect = mocked_track_unstruct
-
-        t = Tracker(e)
-        ctx = SelfDescribingJson("test.context.schema", {"user": "tester"})
-        evTstamp = 1399021242030
-
-        await t.track_form_change("testFormId", "testElemId", "INPUT", "testValue", "text", ["testClass1", "testClass2"], context=[ctx], tstamp=evTstamp)
-
-        expected = {
-            "schema": FORM_CHANGE_SCHEMA,
-            "data": {
-                "formId": "testFormId",
-                "elementId": "testElemId",
-                "nodeName": "INPUT",
-                "value": "testValue",
-                "type": "text",
-                "elementClasses": ["testClass1", "testClass2"]
-            }
-        }
-
-        callArgs = mok_track_unstruct.call_args_list[0][0]
-        self.assertEqual(len(callArgs), 4)
-        self.assertDictEqual(callArgs[0].to_json(), expected)
-        self.assertIs(callArgs[1][0], ctx)
-        self.assertEqual(callArgs[2], evTstamp)
-
-    @async_patch('aio_snowplow_tracker.Tracker.track_unstruct_event')
-    async def test_track_form_change_optional_none(self, mok_track_unstruct: Any) -> None:
-        e = create_mock_emitter()
+    def setUp(self) -> None:
+        self._tracker = Tracker(create_mock_emitter())
+        self._recorder = _Recorder()
+        # an instance attribute shadows the method, so there is nothing to restore
+        self._tracker.track_unstruct_event = self._recorder
+
+    def _run(self, coro: Any) -> Any:
+        return self._loop.run_until_complete(coro)
+
+    def test_track_x_passes_four_args(self) -> None:
+        # the wrappers forward event json, context, tstamp and event subject
+        self._run(self._tracker.track_screen_view("screenName"))
+        self.assertEqual(len(self._recorder.call_args_list[0][0]), 4)
+
+    def test_track_x_all_args(self) -> None:
+        t = self._tracker
+        ctx = self.CTX
+        evTstamp = self.EV_TS
+
+        for name, args, expected in _ALL_ARGS_CASES:
+            with self.subTest(name=name):
+                self._recorder.call_args_list.clear()
+                self._run(getattr(t, name)(*args, context=[ctx], tstamp=evTstamp))
+
+                callArgs = self._recorder.call_args_list[0][0]
+                payload = callArgs[0].to_json()
+                self.assertEqual((payload, callArgs[1], callArgs[2]), (expected, [ctx], evTstamp))
+
+    def test_track_x_optional_none(self) -> None:
+        t = self._tracker
+
+        for name, method, args, kwargs, expected in _OPTIONAL_NONE_CASES:
+            with self.subTest(name=name):
+                self._recorder.call_args_list.clear()
+                self._run(getattr(t, method)(*args, **kwargs))
+
+                callArgs = self._recorder.call_args_list[0][0]
+                payload = callArgs[0].to_json()
+                self.assertEqual((payload, callArgs[1], callArgs[2]), (expected, None, None))
+
+    def test_track_form_submit_invalid_element_type(self) -> None:
+        t = self._tracker
+        ctx = self.CTX
+        evTstamp = self.EV_TS
+        elems = _INVALID_FORM_ELEMS
+
+        with ContractsEnabled(), self.assertRaises(ValueError):
+            self._run(t.track_form_submit("testFormId", ["testClass1", "testClass2"], elems, context=[ctx], tstamp=evTstamp))
+
+    def test_track_form_submit_invalid_element_type_disabled_contracts(self) -> None:
+        t = self._tracker
+        ctx = self.CTX
+        evTstamp = self.EV_TS
+        elems = _INVALID_FORM_ELEMS
 
-        mok_track_unstruct.side_effect = mocked_track_unstruct
+        with ContractsDisabled():
+            self._run(t.track_form_submit("testFormId", ["testClass1", "testClass2"], elems, context=[ctx], tstamp=evTstamp))
 
-        t = Tracker(e)
-        await t.track_form_change("testFormId", "testElemId", "INPUT", "testValue")
+        callArgs = self._recorder.call_args_list[0][0]
+        self.assertEqual((callArgs[0].to_json(), callArgs[1], callArgs[2]), (_EXPECTED_INVALID_FORM_SUBMIT, [ctx], evTstamp))
 
-        expected = {
-            "schema": FORM_CHANGE_SCHEMA,
-            "data": {
-                "formId": "testFormId",
-                "elementId": "testElemId",
-                "nodeName": "INPUT",
-                "value": "testValue",
-            }
-        }
 
-        callArgs = mok_track_unstruct.call_args_list[0][0]
-        self.assertEqual(len(callArgs), 4)
-        self.assertDictEqual(callArgs[0].to_json(), expected)
-        self.assertTrue(callArgs[1] is None)
-        self.assertTrue(callArgs[2] is None)
+@freeze_time("2021-04-19 00:00:01")  # unix: 1618790401000
+class TestCompletePayload(AsyncTestCase):
+    """
+        The clock is frozen once for the whole class rather than per test
+    """
 
-    @async_patch('aio_snowplow_tracker.Tracker.track_unstruct_event')
-    async def test_track_form_submit(self, mok_track_unstruct: Any) -> None:
+    @async_patch_attr(Tracker, 'track')
+    @mock.patch.object(Tracker, 'get_uuid')
+    async def test_complete_payload(self, mok_uuid: Any, mok_track: Any) -> None:
         e = create_mock_emitter()
 
-        mok_track_unstruct.side_effect = mocked_track_unstruct
+        mok_uuid.side_effect = mocked_uuid
 
         t = Tracker(e)
-        ctx = SelfDescribingJson("test.context.schema", {"user": "tester"})
-        evTstamp = 1399021242030
-        elems = [
-            {
-                "name": "user_email",
-                "value": "fake@email.fake",
-                "nodeName": "INPUT",
-                "type": "email"
-            }
-        ]
-
-        await t.track_form_submit("testFormId", ["testClass1", "testClass2"], elems, context=[ctx], tstamp=evTstamp)
-
-        expected = {
-            "schema": FORM_SUBMIT_SCHEMA,
-            "data": {
-                "formId": "testFormId",
-                "formClasses": ["testClass1", "testClass2"],
-                "elements": elems
-            }
-        }
-
-        callArgs = mok_track_unstruct.call_args_list[0][0]
-        self.assertEqual(len(callArgs), 4)
-        self.assertDictEqual(callArgs[0].to_json(), expected)
-        self.assertIs(callArgs[1][0], ctx)
-        self.assertEqual(callArgs[2], evTstamp)
-
-    @async_patch('aio_snowplow_tracker.Tracker.track_unstruct_event')
-    async def test_track_form_submit_invalid_element_type(self, mok_track_unstruct: Any) -> None:
-        e = create_mock_emitter()
-
-        mok_track_unstruct.side_effect = mocked_track_unstruct
+        p = Payload()
+        await t.complete_payload(p, None, None, None)
 
-        t = Tracker(e)
-        ctx = SelfDescribingJson("test.context.schema", {"user": "tester"})
-        evTstamp = 1399021242030
-        elems = [
-            {
-                "name": "user_email",
-                "value": "fake@email.fake",
-                "nodeName": "INPUT",
-                "type": "invalid"
-            }
-        ]
+        self.assertEqual(mok_track.call_count, 1)
+        trackArgsTuple = mok_track.call_args[0]
+        self.assertEqual(len(trackArgsTuple), 1)
+        passed_nv_pairs = trackArgsTuple[0].nv_pairs
 
-        with self.assertRaises(ValueError):
-            await t.track_form_submit("testFormId", ["testClass1", "testClass2"], elems, context=[ctx], tstamp=evTstamp)
+        self.assertEqual(passed_nv_pairs, _EXPECTED_BASE)
 
-    @async_patch('aio_snowplow_tracker.Tracker.track_unstruct_event')
-    async def test_track_form_submit_invalid_element_type_disabled_contracts(self, mok_track_unstruct: Any) -> None:
+    @async_patch_attr(Tracker, 'track')
+    @mock.patch.object(Tracker, 'get_uuid')
+    async def test_complete_payload_tstamp(self, mok_uuid: Any, mok_track: Any) -> None:
         e = create_mock_emitter()
 
-        mok_track_unstruct.side_effect = mocked_track_unstruct
+        mok_uuid.side_effect = mocked_uuid
 
         t = Tracker(e)
-        ctx = SelfDescribingJson("test.context.schema", {"user": "tester"})
-        evTstamp = 1399021242030
-        elems = [
-            {
-                "name": "user_email",
-                "value": "fake@email.fake",
-                "nodeName": "INPUT",
-                "type": "invalid"
-            }
-        ]
-
-        with ContractsDisabled():
-            await t.track_form_submit("testFormId", ["testClass1", "testClass2"], elems, context=[ctx], tstamp=evTstamp)
+        for name, tstamp in [("int", 100010001000), ("float", 100010001000.5)]:
+            with self.subTest(name=name):
+                mok_track.reset_mock()
+                p = Payload()
+                await t.complete_payload(p, None, tstamp, None)
 
-        expected = {
-            "schema": FORM_SUBMIT_SCHEMA,
-            "data": {
-                "formId": "testFormId",
-                "formClasses": ["testClass1", "testClass2"],
-                "elements": elems
-            }
-        }
+                self.assertEqual(mok_track.call_count, 1)
+                trackArgsTuple = mok_track.call_args[0]
+                self.assertEqual(len(trackArgsTuple), 1)
+                passed_nv_pairs = trackArgsTuple[0].nv_pairs
 
-        callArgs = mok_track_unstruct.call_args_list[0][0]
-        self.assertEqual(len(callArgs), 4)
-        self.assertDictEqual(callArgs[0].to_json(), expected)
-        self.assertIs(callArgs[1][0], ctx)
-        self.assertEqual(callArgs[2], evTstamp)
+                self.assertEqual(passed_nv_pairs, _EXPECTED_WITH_TTM)
 
-    @async_patch('aio_snowplow_tracker.Tracker.track_unstruct_event')
-    async def test_track_form_submit_optional_none(self, mok_track_unstruct: Any) -> None:
+    @async_patch_attr(Tracker, 'track')
+    @mock.patch.object(Tracker, 'get_uuid')
+    async def test_complete_payload_co(self, mok_uuid: Any, mok_track: Any) -> None:
         e = create_mock_emitter()
 
-        mok_track_unstruct.side_effect = mocked_track_unstruct
-
-        t = Tracker(e)
-        await t.track_form_submit("testFormId")
-
-        expected = {
-            "schema": FORM_SUBMIT_SCHEMA,
-            "data": {
-                "formId": "testFormId"
-            }
-        }
-
-        callArgs = mok_track_unstruct.call_args_list[0][0]
-        self.assertEqual(len(callArgs), 4)
-        self.assertDictEqual(callArgs[0].to_json(), expected)
-        self.assertTrue(callArgs[1] is None)
-        self.assertTrue(callArgs[2] is None)
-
-    @async_patch('aio_snowplow_tracker.Tracker.track_unstruct_event')
-    async def test_track_form_submit_empty_elems(self, mok_track_unstruct: Any) -> None:
-        e = create_mock_emitter()
+        mok_uuid.side_effect = mocked_uuid
 
-        mok_track_unstruct.side_effect = mocked_track_unstruct
+        t = Tracker(e, encode_base64=False)
+        p = Payload()
 
-        t = Tracker(e)
-        await t.track_form_submit("testFormId", elements=[])
+        ctx_array = [GEO_CTX, MOV_CTX]
+        await t.complete_payload(p, ctx_array, None, None)
 
-        expected = {
-            "schema": FORM_SUBMIT_SCHEMA,
-            "data": {
-                "formId": "testFormId"
-            }
-        }
+        self.assertEqual(mok_track.call_count, 1)
+        trackArgsTuple = mok_track.call_args[0]
+        self.assertEqual(len(trackArgsTuple), 1)
+        passed_nv_pairs = trackArgsTuple[0].nv_pairs
 
-        callArgs = mok_track_unstruct.call_args_list[0][0]
-        self.assertEqual(len(callArgs), 4)
-        self.assertDictEqual(callArgs[0].to_json(), expected)
+        self.assertIn("co", passed_nv_pairs)
+        self.assertEqual(json.loads(passed_nv_pairs["co"]), EXPECTED_CO)
 
-    @async_patch('aio_snowplow_tracker.Tracker.track_unstruct_event')
-    async def test_track_site_search(self, mok_track_unstruct: Any) -> None:
+    @async_patch_attr(Tracker, 'track')
+    @mock.patch.object(Tracker, 'get_uuid')
+    async def test_complete_payload_cx(self, mok_uuid: Any, mok_track: Any) -> None:
         e = create_mock_emitter()
 
-        mok_track_unstruct.side_effect = mocked_track_unstruct
-
-        t = Tracker(e)
-        ctx = SelfDescribingJson("test.context.schema", {"user": "tester"})
-        evTstamp = 1399021242030
-
-        await t.track_site_search(["track", "search"], {"new": True}, 100, 10, context=[ctx], tstamp=evTstamp)
-
-        expected = {
-            "schema": SITE_SEARCH_SCHEMA,
-            "data": {
-                "terms": ["track", "search"],
-                "filters": {"new": True},
-                "totalResults": 100,
-                "pageResults": 10
-            }
-        }
-
-        callArgs = mok_track_unstruct.call_args_list[0][0]
-        self.assertEqual(len(callArgs), 4)
-        self.assertDictEqual(callArgs[0].to_json(), expected)
-        self.assertIs(callArgs[1][0], ctx)
-        self.assertEqual(callArgs[2], evTstamp)
-
-    @async_patch('aio_snowplow_tracker.Tracker.track_unstruct_event')
-    async def test_track_site_search_optional_none(self, mok_track_unstruct: Any) -> None:
-        e = create_mock_emitter()
+        mok_uuid.side_effect = mocked_uuid
 
-        mok_track_unstruct.side_effect = mocked_track_unstruct
+        t = Tracker(e, encode_base64=True)
+        p = Payload()
 
-        t = Tracker(e)
-        await t.track_site_search(["track", "search"])
+        ctx_array = [GEO_CTX, MOV_CTX]
+        await t.complete_payload(p, ctx_array, None, None)
 
-        expected = {
-            "schema": SITE_SEARCH_SCHEMA,
-            "data": {
-                "terms": ["track", "search"]
-            }
-        }
+        self.assertEqual(mok_track.call_count, 1)
+        trackArgsTuple = mok_track.call_args[0]
+        self.assertEqual(len(trackArgsTuple), 1)
+        passed_nv_pairs = trackArgsTuple[0].nv_pairs
 
-        callArgs = mok_track_unstruct.call_args_list[0][0]
-        self.assertEqual(len(callArgs), 4)
-        self.assertDictEqual(callArgs[0].to_json(), expected)
-        self.assertTrue(callArgs[1] is None)
-        self.assertTrue(callArgs[2] is None)
+        self.assertIn("cx", passed_nv_pairs)
 
-    @async_patch('aio_snowplow_tracker.Tracker.track_unstruct_event')
-    async def test_track_screen_view(self, mok_track_unstruct: Any) -> None:
+    @async_patch_attr(Tracker, 'track')
+    @mock.patch.object(Tracker, 'get_uuid')
+    async def test_complete_payload_event_subject(self, mok_uuid: Any, mok_track: Any) -> None:
         e = create_mock_emitter()
 
-        mok_track_unstruct.side_effect = mocked_track_unstruct
+        mok_uuid.side_effect = mocked_uuid
 
         t = Tracker(e)
-        ctx = SelfDescribingJson("test.context.schema", {"user": "tester"})
-        evTstamp = 1399021242030
-
-        await t.track_screen_view("screenName", "screenId", context=[ctx], tstamp=evTstamp)
+        p = Payload()
+        evSubject = Subject().set_lang('EN').set_user_id("tester")
+        await t.complete_payload(p, None, None, evSubject)
 
-        expected = {
-            "schema": SCREEN_VIEW_SCHEMA,
-            "data": {
-                "name": "screenName",
-                "id": "screenId"
-            }
-        }
+        self.assertEqual(mok_track.call_count, 1)
+        trackArgsTuple = mok_track.call_args[0]
+        self.assertEqual(len(trackArgsTuple), 1)
+        passed_nv_pairs = trackArgsTuple[0].nv_pairs
 
-        callArgs = mok_track_unstruct.call_args_list[0][0]
-        self.assertEqual(len(callArgs), 4)
-        self.assertDictEqual(callArgs[0].to_json(), expected)
-        self.assertIs(callArgs[1][0], ctx)
-        self.assertEqual(callArgs[2], evTstamp)
+        self.assertEqual(passed_nv_pairs, _EXPECTED_WITH_SUBJECT)
@@ -772,6 +772,15 @@ class Tracker:
                     await emitter.sync_flush()
         return self
 
+    async def close(self) -> None:
+        """
+            Close the emitters that support it, releasing the HTTP sessions they created.
+            Buffered events are not sent: call `flush` first.
+        """
+        for emitter in self.emitters:
+            if hasattr(emitter, 'close'):
+                await emitter.close()
+
     def set_subject(self, subject: Optional[_subject.Subject]) -> 'Tracker':
         """
             Set the subject of the events fired by the tracker
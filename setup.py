@@ -79,6 +79,9 @@ setup(
     ],
 
     extras_require={
+        "orjson": [
+            "orjson>=3.0.0"
+        ],
         "celery": [
             "celery>=4.0"
         ],